@@ -0,0 +1,65 @@
+"""
+Benchmark da compressão de respostas.
+
+Mede, para a rota de importação de todas as categorias, o tamanho do payload e a
+latência de servidor com e sem compressão, separando o primeiro acesso (que
+comprime) dos acessos seguintes (servidos já comprimidos do cache) e do ano
+mais recente, que não é cacheado e é comprimido a cada requisição. Também
+estima o tempo de transferência em um link lento.
+
+Uso:
+    python benchmarks/bench_compression.py [--requests 200] [--link-mbps 10]
+"""
+
+import argparse
+import statistics
+import time
+
+from fixtures import offline_pages, trade_page
+
+from api import create_app
+from api.compression import CACHE_EXTENSION, supported_encodings
+
+
+def _measure(client, path, encoding, n, clear_cache):
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    timings, size = [], 0
+    for _ in range(n):
+        if clear_cache:
+            clear_cache()
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append(time.perf_counter() - start)
+        size = len(response.get_data())
+    return size, statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por cenário")
+    parser.add_argument("--countries", type=int, default=130, help="Países por categoria")
+    parser.add_argument("--link-mbps", type=float, default=10.0, help="Banda do link simulado em Mbit/s")
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    cache = app.extensions[CACHE_EXTENSION]
+    historical = "/api/import?year=2015"
+    latest = "/api/import"
+
+    print(f"{'encoding':<10}{'cenário':<12}{'bytes':>10}{'servidor ms':>14}{'link ms':>10}{'total ms':>10}")
+    with offline_pages(lambda url: trade_page(args.countries)):
+        for encoding in [None] + supported_encodings():
+            scenarios = [
+                ("dinâmica", latest, None),
+                ("1º acesso", historical, cache.clear),
+                ("com cache", historical, None),
+            ]
+            for label, path, clear in scenarios:
+                size, server_ms = _measure(client, path, encoding, args.requests, clear)
+                link_ms = size * 8 / (args.link_mbps * 1_000_000) * 1000
+                print(f"{encoding or 'identity':<10}{label:<12}{size:>10}{server_ms:>14.2f}{link_ms:>10.2f}{server_ms + link_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
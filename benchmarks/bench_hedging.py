@@ -0,0 +1,83 @@
+"""
+Benchmark da latência de cauda das buscas com e sem hedging.
+
+Aponta o scraper para um servidor local que imita o site da Embrapa e atrasa
+uma fração das respostas, e mede os percentis de latência das buscas e o
+número de requisições feitas ao servidor em cada cenário.
+
+Uso:
+    python benchmarks/bench_hedging.py [--requests 400] [--concurrency 4] [--slow-fraction 0.03] [--slow-delay 1.0]
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from fixtures import trade_page
+from standin import StandInServer
+
+from scraper import VitiBrasilScraper, hedging  # noqa: E402 (fixtures ajusta o sys.path)
+
+
+def _percentile(samples: list, quantile: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+
+def run(url: str, requests: int, concurrency: int) -> list:
+    scraper = VitiBrasilScraper()
+    scraper.BASE_URL = url
+
+    def fetch(_):
+        started = time.perf_counter()
+        scraper.get_export_data("vinhos_mesa", year=2015)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(fetch, range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400, help="Buscas por cenário")
+    parser.add_argument("--concurrency", type=int, default=4, help="Buscas simultâneas")
+    parser.add_argument("--base-delay", type=float, default=0.02, help="Latência típica do servidor em segundos")
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Fração das respostas atrasadas")
+    parser.add_argument("--slow-delay", type=float, default=1.0, help="Atraso das respostas lentas em segundos")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos atrasos sorteados")
+    args = parser.parse_args()
+
+    page = trade_page(60)
+    rng = random.Random(args.seed)
+    lock = Lock()
+    upstream_requests = [0]
+
+    def delay() -> float:
+        with lock:
+            upstream_requests[0] += 1
+            slow = rng.random() < args.slow_fraction
+            jitter = rng.uniform(0, args.base_delay / 2)
+        return args.slow_delay if slow else args.base_delay + jitter
+
+    print(f"{'cenário':<12}{'p50 (ms)':>10}{'p90 (ms)':>10}{'p99 (ms)':>10}{'máx (ms)':>10}{'req. servidor':>15}")
+    with StandInServer(lambda query: page, delay) as upstream:
+        for label, enabled in (("sem hedging", False), ("com hedging", True)):
+            if enabled:
+                # Limiar inicial baixo para que o aquecimento não domine uma execução curta
+                hedging.enable(initial_delay=args.base_delay * 3)
+            else:
+                hedging.disable()
+            upstream_requests[0] = 0
+            latencies = run(upstream.url, args.requests, args.concurrency)
+            print(
+                f"{label:<12}"
+                + "".join(f"{_percentile(latencies, q) * 1000:>10.1f}" for q in (0.5, 0.9, 0.99))
+                + f"{max(latencies) * 1000:>10.1f}{upstream_requests[0]:>15}"
+            )
+    hedging.disable()
+
+
+if __name__ == "__main__":
+    main()
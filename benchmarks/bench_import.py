@@ -0,0 +1,61 @@
+"""
+Benchmark do tempo de importação e de inicialização.
+
+Mede, em processos novos, o tempo para importar o scraper, importar o pacote
+da API, criar a aplicação Flask e responder a `cli.py --help`. O cenário frio
+usa um diretório de bytecode vazio a cada execução (os módulos precisam ser
+compilados); o quente reaproveita o bytecode já gravado.
+
+Para comparar com outra versão, aponte --src para a pasta vitibrasil_scraper
+de um checkout dessa versão (ex.: criado com `git worktree add`).
+
+Uso:
+    python benchmarks/bench_import.py [--runs 10] [--src vitibrasil_scraper]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ("import scraper", ["-c", "import scraper"]),
+    ("import api", ["-c", "import api"]),
+    ("create_app()", ["-c", "from api import create_app; create_app()"]),
+    ("cli.py --help", ["cli.py", "--help"]),
+]
+
+
+def _run(src: str, args: list, pycache: str) -> float:
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=src, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Execuções por cenário")
+    parser.add_argument("--src", default=os.path.join(ROOT, "vitibrasil_scraper"), help="Pasta vitibrasil_scraper a medir")
+    args = parser.parse_args()
+
+    baseline = statistics.median(_run(args.src, ["-c", "pass"], tempfile.mkdtemp()) for _ in range(args.runs))
+    print(f"Interpretador vazio: {baseline * 1000:.1f} ms (descontado abaixo)")
+    print(f"{'cenário':<18}{'frio ms':>10}{'quente ms':>12}")
+    for label, command in SCENARIOS:
+        cold = [_run(args.src, command, tempfile.mkdtemp()) for _ in range(args.runs)]
+        warm_cache = tempfile.mkdtemp()
+        _run(args.src, command, warm_cache)
+        warm = [_run(args.src, command, warm_cache) for _ in range(args.runs)]
+        cold_ms = (statistics.median(cold) - baseline) * 1000
+        warm_ms = (statistics.median(warm) - baseline) * 1000
+        print(f"{label:<18}{cold_ms:>10.1f}{warm_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
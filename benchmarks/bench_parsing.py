@@ -0,0 +1,94 @@
+"""
+Benchmark de escalabilidade dos parsers com tabelas grandes.
+
+Gera páginas sintéticas no formato do site da Embrapa com um número crescente
+de linhas e mede, para o parser de cada dataset, o tempo de análise do HTML
+(BeautifulSoup), o tempo de extração da tabela e o pico de memória. O expoente
+de escala entre tamanhos consecutivos indica crescimento superlinear: próximo
+de 1 é linear, e valores acima de --max-exponent são sinalizados.
+
+Uso:
+    python benchmarks/bench_parsing.py [--rows 500 2000 8000] [--depth 2] [--fanout 8] [--repeat 3]
+"""
+
+import argparse
+import math
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from fixtures import product_page, trade_page
+
+from scraper import VitiBrasilScraper  # noqa: E402 (fixtures ajusta o sys.path)
+from scraper.datasets import DATASETS  # noqa: E402
+
+
+def _page(dataset, n_rows: int, depth: int, fanout: int) -> str:
+    if dataset.name in ("import", "export"):
+        return trade_page(n_rows)
+    return product_page(n_rows, depth=depth, fanout=fanout)
+
+
+def measure(scraper, dataset, html: str, repeat: int) -> tuple:
+    """Retorna o menor tempo de análise e de extração, em segundos, e o pico de memória em bytes."""
+    parser = getattr(scraper, dataset.parser)
+    args = [next(iter(dataset.categories))] if dataset.categories else []
+
+    html_seconds = extract_seconds = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        soup = BeautifulSoup(html, "html.parser")
+        parsed = time.perf_counter()
+        parser(soup, *args)
+        html_seconds = min(html_seconds, parsed - started)
+        extract_seconds = min(extract_seconds, time.perf_counter() - parsed)
+
+    tracemalloc.start()
+    parser(BeautifulSoup(html, "html.parser"), *args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return html_seconds, extract_seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 2000, 8000], help="Números de linhas a testar")
+    parser.add_argument("--depth", type=int, default=2, help="Níveis da hierarquia de itens (tb_item/tb_subitem)")
+    parser.add_argument("--fanout", type=int, default=8, help="Subitens por item")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por medida (vale a menor)")
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="Expoente de escala acima do qual o parser é sinalizado")
+    args = parser.parse_args()
+
+    scraper = VitiBrasilScraper()
+    superlinear = []
+    print(f"{'dataset':<19}{'linhas':>8}{'html (ms)':>11}{'extração (ms)':>15}{'pico (MiB)':>12}{'expoente':>10}")
+    for dataset in DATASETS.values():
+        previous = None
+        for n_rows in sorted(args.rows):
+            html = _page(dataset, n_rows, args.depth, args.fanout)
+            html_seconds, extract_seconds, peak = measure(scraper, dataset, html, args.repeat)
+            total = html_seconds + extract_seconds
+
+            exponent = ""
+            if previous is not None:
+                value = math.log(total / previous[1]) / math.log(n_rows / previous[0])
+                exponent = f"{value:.2f}"
+                if value > args.max_exponent:
+                    exponent += " !"
+                    superlinear.append(f"{dataset.name} ({previous[0]} -> {n_rows} linhas: {value:.2f})")
+            previous = (n_rows, total)
+
+            print(
+                f"{dataset.name:<19}{n_rows:>8}{html_seconds * 1000:>11.1f}{extract_seconds * 1000:>15.1f}"
+                f"{peak / 2 ** 20:>12.1f}{exponent:>10}"
+            )
+
+    if superlinear:
+        print("\nCrescimento superlinear em: " + "; ".join(superlinear))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
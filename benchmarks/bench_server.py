@@ -0,0 +1,105 @@
+"""
+Benchmark de carga do servidor de produção.
+
+Inicia a API com o Gunicorn para cada número de workers informado, apontando o
+scraper para um servidor local que imita o site da Embrapa, e mede a vazão de
+requisições com um gerador de carga de conexões persistentes.
+
+Uso:
+    python benchmarks/bench_server.py [--workers 1 2 4] [--threads 4] [--concurrency 32] [--duration 10]
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from standin import StandInServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH = "/api/export/vinhos_mesa"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("O servidor não respondeu a tempo")
+
+
+def _client(port: int, stop_at: float) -> tuple:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    ok = errors = 0
+    while time.monotonic() < stop_at:
+        try:
+            conn.request("GET", PATH)
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                ok += 1
+            else:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.close()
+    return ok, errors
+
+
+def run(workers: int, threads: int, concurrency: int, duration: float, upstream: str) -> tuple:
+    port = _free_port()
+    env = dict(os.environ, VITIBRASIL_BASE_URL=upstream)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "vitibrasil_scraper", "cli.py"), "--server", "production",
+         "--port", str(port), "--workers", str(workers), "--threads", str(threads)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_ready(port)
+        stop_at = time.monotonic() + duration
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda _: _client(port, stop_at), range(concurrency)))
+        ok = sum(r[0] for r in results)
+        errors = sum(r[1] for r in results)
+        return ok / duration, errors
+    finally:
+        # SIGTERM: encerramento gracioso dos workers
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Números de workers a testar")
+    parser.add_argument("--threads", type=int, default=4, help="Threads por worker")
+    parser.add_argument("--concurrency", type=int, default=32, help="Conexões simultâneas do gerador de carga")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duração de cada cenário em segundos")
+    args = parser.parse_args()
+
+    print(f"CPUs disponíveis: {os.cpu_count()}")
+    print(f"{'workers':>8}{'threads':>9}{'req/s':>10}{'erros':>8}")
+    with StandInServer() as upstream:
+        for workers in args.workers:
+            throughput, errors = run(workers, args.threads, args.concurrency, args.duration, upstream.url)
+            print(f"{workers:>8}{args.threads:>9}{throughput:>10.1f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Páginas sintéticas no formato das tabelas do site da Embrapa, usadas pelos benchmarks.
+
+Os benchmarks rodam sem acesso à rede: o método `_fetch_page` do scraper é
+substituído por uma versão que devolve essas páginas.
+"""
+
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from itertools import islice
+
+from bs4 import BeautifulSoup
+
+# Os módulos do pacote importam uns aos outros como `scraper` e `api`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vitibrasil_scraper"))
+
+from scraper.base import BaseScraper  # noqa: E402
+
+# Os logs por requisição do scraper poluiriam a saída dos benchmarks
+logging.disable(logging.INFO)
+
+COUNTRIES = [
+    "Afeganistão", "África do Sul", "Alemanha", "Angola", "Antígua e Barbuda",
+    "Argentina", "Austrália", "Áustria", "Bahamas", "Bélgica", "Bolívia",
+    "Canadá", "Chile", "China", "Colômbia", "Coreia do Sul", "Costa Rica",
+    "Dinamarca", "Emirados Árabes Unidos", "Equador", "Espanha",
+    "Estados Unidos", "Finlândia", "França", "Grécia", "Haiti", "Holanda",
+    "Hong Kong", "Índia", "Irlanda", "Itália", "Japão", "Líbano", "México",
+    "Nigéria", "Noruega", "Nova Zelândia", "Panamá", "Paraguai", "Peru",
+    "Polônia", "Portugal", "Reino Unido", "República Dominicana", "Rússia",
+    "Suécia", "Suíça", "Taiwan", "Uruguai", "Venezuela",
+]
+
+
+def _format_number(value):
+    return "-" if value is None else f"{value:,}".replace(",", ".")
+
+
+def trade_page(n_countries: int = 130, year: int = 2015, title: str = "Importação de vinhos de mesa") -> str:
+    """Gera uma página de importação/exportação com `n_countries` linhas."""
+    rows = []
+    for i in range(n_countries):
+        name = COUNTRIES[i % len(COUNTRIES)] + ("" if i < len(COUNTRIES) else f" {i // len(COUNTRIES)}")
+        # Cerca de um terço dos países não tem movimento no ano, como no site real
+        quantity = None if i % 3 == 0 else (i * 7919) % 5_000_000
+        value = None if quantity is None else (i * 104729) % 20_000_000
+        rows.append(
+            f'<tr><td class="tb_item">{name}</td>'
+            f"<td>{_format_number(quantity)}</td><td>{_format_number(value)}</td></tr>"
+        )
+    return (
+        "<html><body>"
+        f'<p class="text_center">{title} [{year}]</p>'
+        '<table class="tb_base tb_dados"><thead><tr><th>Países</th><th>Quantidade (Kg)</th><th>Valor (US$)</th></tr></thead>'
+        f"<tbody>{''.join(rows)}</tbody>"
+        '<tfoot class="tb_total"><tr><td>Total</td><td>123.456.789</td><td>987.654.321</td></tr></tfoot>'
+        "</table>"
+        '<div class="tb_font">Fonte: MDIC/SECEX</div>'
+        "</body></html>"
+    )
+
+
+def _hierarchy_levels(depth: int, fanout: int):
+    """Gera, em pré-ordem, o nível de cada linha de uma árvore de itens sem fim."""
+    def subtree(level):
+        yield level
+        if level + 1 < depth:
+            for _ in range(fanout):
+                yield from subtree(level + 1)
+
+    while True:
+        yield from subtree(0)
+
+
+def product_page(n_rows: int = 60, depth: int = 2, fanout: int = 8, year: int = 2015, title: str = "Produção de vinhos, sucos e derivados") -> str:
+    """
+    Gera uma página de produção/processamento/comercialização com `n_rows` linhas.
+
+    As linhas formam uma hierarquia de `depth` níveis, com `fanout` filhos por
+    item: o primeiro nível tem a classe `tb_item` e os demais `tb_subitem`,
+    como no site (que tem dois níveis).
+    """
+    rows = []
+    for i, level in enumerate(islice(_hierarchy_levels(depth, fanout), n_rows)):
+        css = "tb_item" if level == 0 else "tb_subitem"
+        name = f"Produto {i}" if level == 0 else f"{'Sub' * level}produto {i}"
+        quantity = None if i % 7 == 0 else (i * 7919) % 500_000_000
+        rows.append(f'<tr><td class="{css}">{name}</td><td class="{css}">{_format_number(quantity)}</td></tr>')
+    return (
+        "<html><body>"
+        f'<p class="text_center">{title} [{year}]</p>'
+        '<table class="tb_base tb_dados"><thead><tr><th>Produto</th><th>Quantidade (L.)</th></tr></thead>'
+        f"<tbody>{''.join(rows)}</tbody>"
+        '<tfoot class="tb_total"><tr><td>Total</td><td>456.789.123</td></tr></tfoot>'
+        "</table>"
+        '<div class="tb_font">Fonte: Embrapa Uva e Vinho</div>'
+        "</body></html>"
+    )
+
+
+@contextmanager
+def offline_pages(page_for_url):
+    """
+    Substitui temporariamente a busca HTTP do scraper por páginas sintéticas.
+
+    Args:
+        page_for_url: Função que recebe a URL requisitada e devolve o HTML da página
+    """
+    original = BaseScraper._fetch_page
+
+    def fake_fetch_page(self, url):
+        return BeautifulSoup(page_for_url(url), "html.parser")
+
+    BaseScraper._fetch_page = fake_fetch_page
+    try:
+        yield
+    finally:
+        BaseScraper._fetch_page = original
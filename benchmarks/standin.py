@@ -0,0 +1,57 @@
+"""
+Servidor HTTP local que imita o site da Embrapa, servindo páginas sintéticas.
+
+Usado pelos benchmarks que exercitam a pilha completa (rede, retries e
+servidor da API) sem depender do site real.
+"""
+
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from fixtures import trade_page
+
+
+class StandInServer:
+    """Servidor local em uma thread de fundo, com atraso opcional por requisição."""
+
+    def __init__(self, page_for_query: Optional[Callable[[dict], str]] = None, delay_for_request: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            page_for_query: Função que recebe a query string analisada e devolve o HTML
+            delay_for_request: Função que devolve quantos segundos esperar antes de responder
+        """
+        page_for_query = page_for_query or (lambda query: trade_page())
+        delay_for_request = delay_for_request or (lambda: 0.0)
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                delay = delay_for_request()
+                if delay:
+                    time.sleep(delay)
+                body = page_for_query(parse_qs(urlsplit(self.path).query)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,8 +1,20 @@
 """
 Pacote Scraper VitiBrasil.
+
+VitiBrasilScraper e create_app são carregados sob demanda, de modo que usar
+apenas o scraper não importa o Flask nem as rotas da API.
 """
 
-from vitibrasil_scraper.scraper import VitiBrasilScraper
-from vitibrasil_scraper.api import create_app
+__version__ = "0.1.0"
+
+__all__ = ["VitiBrasilScraper", "create_app"]
+
 
-__version__ = "0.1.0" 
\ No newline at end of file
+def __getattr__(name):
+    if name == "VitiBrasilScraper":
+        from vitibrasil_scraper.scraper import VitiBrasilScraper
+        return VitiBrasilScraper
+    if name == "create_app":
+        from vitibrasil_scraper.api import create_app
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
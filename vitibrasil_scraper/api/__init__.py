@@ -1,19 +1,39 @@
 """
 API Flask para dados do VitiBrasil.
-"""
 
-from flask import Flask
+O Flask e os módulos de rotas são importados apenas quando create_app é
+chamada, para que importar o pacote (ex.: api.server) seja rápido.
+"""
 
-from .production import register_production_routes
-from .processing import register_processing_routes
-from .commercialization import register_commercialization_routes
-from .imports import register_import_routes
-from .exports import register_export_routes
-from .index import register_index_route
+from typing import Optional
 
-def create_app():
-    """Cria e configura a aplicação Flask."""
+def create_app(config: Optional[dict] = None):
+    """
+    Cria e configura a aplicação Flask.
+    
+    Args:
+        config: Configurações adicionais aplicadas a app.config (ex.: VITIBRASIL_PROFILE, VITIBRASIL_SNAPSHOT, VITIBRASIL_DEADLINE)
+    """
+    from flask import Flask
+    
+    from .production import register_production_routes
+    from .processing import register_processing_routes
+    from .commercialization import register_commercialization_routes
+    from .imports import register_import_routes
+    from .exports import register_export_routes
+    from .trade_balance import register_trade_balance_routes
+    from .batch import register_batch_routes
+    from .events import register_event_routes
+    from .index import register_index_route
+    from .metrics import register_metrics_route
+    from .deadline import register_deadlines
+    from .compression import register_compression
+    from .snapshot import register_snapshot
+    from .profiling import register_profiling
+    
     app = Flask(__name__)
+    if config:
+        app.config.update(config)
     
     # Registra todas as rotas
     register_production_routes(app)
@@ -21,6 +41,22 @@ def create_app():
     register_commercialization_routes(app)
     register_import_routes(app)
     register_export_routes(app)
+    register_trade_balance_routes(app)
+    register_batch_routes(app)
+    register_event_routes(app)
     register_index_route(app)
+    register_metrics_route(app)
+    
+    # Prazo de cada requisição, propagado às buscas do scraper
+    register_deadlines(app)
+    
+    # Compressão das respostas e cache de respostas históricas
+    register_compression(app)
+    
+    # Respostas servidas do snapshot compartilhado, depois do cache de respostas
+    register_snapshot(app)
+    
+    # Perfilamento opcional das requisições
+    register_profiling(app)
     
     return app 
\ No newline at end of file
@@ -0,0 +1,436 @@
+"""
+Variante ASGI da API, com os mesmos endpoints e formato JSON de `create_app`.
+
+Os handlers aguardam o scraper assíncrono em vez de bloquear uma thread
+durante a busca no site da Embrapa, então a concorrência deixa de ser limitada
+pelo número de threads. O stream de avisos /api/events também não ocupa uma
+thread por conexão; seu intervalo de verificação vem da variável de ambiente
+VITIBRASIL_EVENTS_INTERVAL. Com VITIBRASIL_SNAPSHOT, as mudanças são lidas do
+snapshot e os agregados (yoy, shares, growth) são servidos dele.
+
+Exemplo:
+    uvicorn --factory api.asgi:create_asgi_app
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from scraper import metrics
+from scraper.async_scraper import AsyncVitiBrasilScraper
+from scraper.changes import AsyncSubscription, ChangeBroker, ChangeWatcher, TooManySubscribers
+from scraper.datasets import DATASETS
+from scraper.exports import EXPORT_CATEGORIES
+from scraper.imports import IMPORT_CATEGORIES
+from scraper.deadline import DeadlineExceeded, expired, remaining, within
+from scraper.logs import configure_logging_from_env
+from scraper.snapshot import SnapshotReader
+
+from .batch import BatchError, BatchKey, can_join, lookup_deadline, parse_batch
+from .cache import LRUCache
+from .deadline import default_deadline, request_deadline
+from .events import HEARTBEAT_INTERVAL, RETRY_MS, format_event
+from .index import API_INFO
+from .query import QueryError, TradeQuery
+from .snapshot import find_rollup
+from .trade_balance import TRADE_BALANCE_CATEGORIES, balance_result, parse_year_range, resolve_latest, result_ttl, split_tables
+
+# Conexões abertas a /api/events por worker, sem VITIBRASIL_EVENTS_MAX_SUBSCRIBERS
+DEFAULT_MAX_SUBSCRIBERS = 1000
+
+
+class FlaskStyleJSONResponse(JSONResponse):
+    """Resposta JSON serializada como no jsonify do Flask, para payloads idênticos entre as variantes."""
+
+    def render(self, content) -> bytes:
+        return json.dumps(content, ensure_ascii=True, sort_keys=True, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class EventStreamResponse(StreamingResponse):
+    """Stream de avisos que executa on_close ao fim da resposta, mesmo que o corpo nunca comece a ser enviado."""
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+class RequestTimer:
+    """Middleware ASGI que registra vitibrasil_request_seconds, como api.metrics nas rotas Flask."""
+
+    def __init__(self, app, labels: Dict):
+        """
+        Args:
+            app: A aplicação ASGI
+            labels: O label de rota (no formato das rotas Flask) de cada endpoint
+        """
+        self.app = app
+        self.labels = labels
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not metrics.REGISTRY.enabled:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+
+        async def timed_send(message):
+            # Como no after_request do Flask, mede até o início da resposta (e não até o fim de um stream)
+            if message["type"] == "http.response.start":
+                metrics.REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    route=self.labels.get(scope.get("endpoint"), "unmatched"),
+                    method=scope["method"],
+                    status=message["status"],
+                )
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+def create_asgi_app(max_connections: int = 100, deadline: Optional[float] = None, max_subscribers: Optional[int] = None) -> Starlette:
+    """
+    Cria a aplicação ASGI.
+
+    Args:
+        max_connections: Número máximo de conexões simultâneas com o site da Embrapa
+        deadline: Prazo padrão das requisições em segundos; se None, o de VITIBRASIL_DEADLINE (ver api.deadline)
+        max_subscribers: Máximo de conexões abertas a /api/events; se None, o de VITIBRASIL_EVENTS_MAX_SUBSCRIBERS
+    """
+    # Os workers iniciados por spawn não passam pela configuração de logging da linha de comando
+    configure_logging_from_env()
+
+    scraper = AsyncVitiBrasilScraper(max_connections=max_connections)
+    if deadline is None:
+        deadline = default_deadline()
+    if max_subscribers is None:
+        max_subscribers = int(os.environ.get("VITIBRASIL_EVENTS_MAX_SUBSCRIBERS") or DEFAULT_MAX_SUBSCRIBERS)
+
+    # Avisos de mudança, como em api.events; a thread de verificação começa com o primeiro cliente
+    broker = ChangeBroker(max_subscribers=max_subscribers)
+    snapshot_path = os.environ.get("VITIBRASIL_SNAPSHOT")
+    snapshot_reader = SnapshotReader(snapshot_path) if snapshot_path else None
+    watcher = ChangeWatcher(
+        broker,
+        interval=float(os.environ.get("VITIBRASIL_EVENTS_INTERVAL") or 300),
+        snapshot_reader=snapshot_reader,
+    )
+
+    async def fetch(getter, request: Request, apply=None, **kwargs):
+        """
+        Executa um método do scraper com o parâmetro 'year', tratando erros como as rotas Flask.
+
+        Args:
+            apply: Método de TradeQuery aplicado aos dados, nas rotas de importação/exportação
+        """
+        year = request.query_params.get('year')
+
+        if apply is not None:
+            try:
+                query = TradeQuery.from_args(request.query_params)
+            except QueryError as e:
+                return FlaskStyleJSONResponse({"error": str(e)}, status_code=400)
+
+        try:
+            seconds = request_deadline(request.headers, deadline)
+        except ValueError as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=400)
+
+        try:
+            if year:
+                year = int(year)
+            with within(seconds):
+                data = await getter(year=year, **kwargs)
+            if apply is not None:
+                data = apply(query, data)
+            return FlaskStyleJSONResponse(data)
+        except DeadlineExceeded as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=504)
+        except ValueError as e:
+            # Como nas rotas Flask, apenas as rotas por categoria respondem 400
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=400 if kwargs else 500)
+        except Exception as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=500)
+
+    async def index(request: Request):
+        return FlaskStyleJSONResponse(API_INFO)
+
+    async def get_metrics(request: Request):
+        if not metrics.REGISTRY.enabled:
+            return FlaskStyleJSONResponse({"error": "Métricas desabilitadas. Defina VITIBRASIL_METRICS=1 ou use a opção --metrics."}, status_code=404)
+        return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    async def get_production(request: Request):
+        return await fetch(scraper.get_production_data, request)
+
+    async def get_processing(request: Request):
+        return await fetch(scraper.get_all_processing_data, request)
+
+    async def get_processing_by_category(request: Request):
+        return await fetch(scraper.get_processing_data, request, category=request.path_params['category'])
+
+    async def get_commercialization(request: Request):
+        return await fetch(scraper.get_commercialization_data, request)
+
+    async def get_import(request: Request):
+        return await fetch(scraper.get_all_import_data, request, apply=TradeQuery.apply_all)
+
+    async def get_import_by_category(request: Request):
+        return await fetch(scraper.get_import_data, request, apply=TradeQuery.apply, category=request.path_params['category'])
+
+    async def get_export(request: Request):
+        return await fetch(scraper.get_all_export_data, request, apply=TradeQuery.apply_all)
+
+    async def get_export_by_category(request: Request):
+        return await fetch(scraper.get_export_data, request, apply=TradeQuery.apply, category=request.path_params['category'])
+
+    def rollup(request: Request, name: str, categories=None, by_year: bool = False):
+        """Responde com um agregado do snapshot, como api.snapshot.rollup_response."""
+        category = request.path_params.get('category')
+        if categories is not None and category not in categories:
+            return FlaskStyleJSONResponse({"error": f"Categoria inválida: {category}. Opções válidas são: {', '.join(categories)}"}, status_code=400)
+        year = request.query_params.get('year') if by_year else None
+        try:
+            year = int(year) if year else None
+        except ValueError:
+            return FlaskStyleJSONResponse({"error": f"Ano inválido: {year}"}, status_code=400)
+        payload, status = find_rollup(snapshot_reader, name, category, year)
+        if status != 200:
+            return FlaskStyleJSONResponse(payload, status_code=status)
+        return Response(bytes(payload) + b"\n", media_type="application/json")
+
+    async def get_production_growth(request: Request):
+        return rollup(request, "production.growth")
+
+    async def get_import_yoy(request: Request):
+        return rollup(request, "import.yoy", IMPORT_CATEGORIES)
+
+    async def get_import_shares(request: Request):
+        return rollup(request, "import.shares", IMPORT_CATEGORIES, by_year=True)
+
+    async def get_export_yoy(request: Request):
+        return rollup(request, "export.yoy", EXPORT_CATEGORIES)
+
+    async def get_export_shares(request: Request):
+        return rollup(request, "export.shares", EXPORT_CATEGORIES, by_year=True)
+
+    # Saldos por (categoria, início, fim), como na rota Flask
+    balance_cache = LRUCache(max_entries=128, name="trade_balance")
+
+    async def fetch_tables(category: str, lookups: List[Tuple[str, Optional[int]]]) -> Dict[Tuple[str, Optional[int]], Dict]:
+        """Busca as tabelas (dataset, ano) pedidas, do snapshot quando possível, indexadas pelo ano pedido."""
+        snapshot = snapshot_reader.current() if snapshot_reader is not None else None
+        getters = {"import": scraper.get_import_data, "export": scraper.get_export_data}
+        tables = {}
+        tasks = {}
+        for dataset, year in lookups:
+            data = snapshot.get(dataset, category, year) if snapshot is not None else None
+            if data is not None:
+                tables[(dataset, year)] = data
+            else:
+                tasks[(dataset, year)] = asyncio.ensure_future(getters[dataset](category=category, year=year))
+        try:
+            for lookup, data in zip(tasks, await asyncio.gather(*tasks.values())):
+                tables[lookup] = data
+        finally:
+            # Após uma falha, as buscas restantes são canceladas
+            for task in tasks.values():
+                task.cancel()
+        return tables
+
+    async def get_trade_balance(request: Request):
+        category = request.query_params.get('category')
+        if category not in TRADE_BALANCE_CATEGORIES:
+            return FlaskStyleJSONResponse({"error": f"Categoria inválida: {category}. Opções válidas são: {', '.join(TRADE_BALANCE_CATEGORIES)}"}, status_code=400)
+        try:
+            start, end = parse_year_range(request.query_params)
+            seconds = request_deadline(request.headers, deadline)
+        except ValueError as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=400)
+
+        key = (category, start, end)
+        result = balance_cache.get(key)
+        if result is not None:
+            return FlaskStyleJSONResponse(result)
+
+        try:
+            with within(seconds):
+                lagging: List[Dict] = []
+                first, last = start, end
+                if start is None:
+                    latest = await fetch_tables(category, [("import", None), ("export", None)])
+                    first, lagging, tables = resolve_latest(category, latest)
+                    last = first
+                    tables.update(await fetch_tables(category, [(dataset, first) for dataset in ("import", "export") if (dataset, first) not in tables]))
+                else:
+                    tables = await fetch_tables(category, [(dataset, year) for dataset in ("import", "export") for year in range(start, end + 1)])
+            imports, exports, missing = split_tables(tables, lagging)
+            result, status = balance_result(category, first, last, imports, exports, missing)
+        except DeadlineExceeded as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=504)
+        except ValueError as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=400)
+        except Exception as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=500)
+
+        if status != 200:
+            return FlaskStyleJSONResponse(result, status_code=status)
+        balance_cache.set(key, result, ttl=result_ttl(end, missing))
+        return FlaskStyleJSONResponse(result)
+
+    # Consultas em andamento e o prazo de cada uma, compartilhadas entre lotes concorrentes (ver batch.can_join)
+    inflight: Dict[BatchKey, Tuple[asyncio.Task, Optional[float]]] = {}
+
+    async def lookup(key: BatchKey) -> Dict:
+        dataset, category, year = key
+        return await DATASETS[dataset].fetch(scraper, category=category, year=year)
+
+    def submit(key: BatchKey) -> asyncio.Task:
+        deadline = lookup_deadline()
+        task, inflight_deadline = inflight.get(key, (None, None))
+        if task is not None and not task.done() and can_join(inflight_deadline, deadline):
+            return task
+        # A tarefa herda o prazo do contexto desta requisição
+        task = asyncio.ensure_future(lookup(key))
+        inflight[key] = (task, deadline)
+        task.add_done_callback(lambda done: release(key, done))
+        return task
+
+    def release(key: BatchKey, task: asyncio.Task):
+        if inflight.get(key, (None, None))[0] is task:
+            del inflight[key]
+        # Marca o erro como tratado: todos os lotes que aguardavam a consulta podem ter desistido antes
+        if not task.cancelled():
+            task.exception()
+
+    async def result(key: BatchKey, task: asyncio.Task) -> Dict:
+        """Aguarda uma consulta até o prazo da requisição, sem cancelá-la para os demais lotes."""
+        while True:
+            left = remaining()
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), None if left is None else max(left, 0))
+            except DeadlineExceeded:
+                # Consulta compartilhada cujo prazo se esgotou antes do desta requisição: é refeita
+                if expired():
+                    raise
+                task = submit(key)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded()
+
+    async def post_batch(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        try:
+            entries = parse_batch(body)
+        except BatchError as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=400)
+        try:
+            seconds = request_deadline(request.headers, deadline)
+        except ValueError as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=400)
+
+        # As tarefas herdam o prazo do contexto em que são criadas
+        with within(seconds):
+            keys = list(dict.fromkeys(entry for entry in entries if isinstance(entry, tuple)))
+            outcomes = dict(zip(keys, await asyncio.gather(*(result(key, submit(key)) for key in keys), return_exceptions=True)))
+
+        results = []
+        partial = False
+        for entry in entries:
+            if isinstance(entry, dict):
+                results.append(entry)
+            elif isinstance(outcomes[entry], BaseException):
+                partial = partial or isinstance(outcomes[entry], DeadlineExceeded)
+                results.append({"error": str(outcomes[entry])})
+            else:
+                partial = partial or bool(outcomes[entry].get("partial"))
+                results.append(outcomes[entry])
+        if partial:
+            return FlaskStyleJSONResponse({"results": results, "partial": True})
+        return FlaskStyleJSONResponse({"results": results})
+
+    async def stream(subscription: AsyncSubscription, datasets: Optional[Set[str]]) -> AsyncIterator[str]:
+        yield f"retry: {RETRY_MS}\n\n"
+        if subscription.missed is None:
+            yield "event: reset\ndata: {}\n\n"
+        for event in subscription.missed or []:
+            if datasets is None or event["dataset"] in datasets:
+                yield format_event(event)
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_INTERVAL)
+            if event is None:
+                if subscription.closed:
+                    return
+                yield ": keep-alive\n\n"
+            elif datasets is None or event["dataset"] in datasets:
+                yield format_event(event)
+
+    async def get_events(request: Request):
+        datasets = None
+        if request.query_params.get('dataset'):
+            datasets = {name.strip() for name in request.query_params['dataset'].split(",") if name.strip()}
+            invalid = sorted(datasets - set(DATASETS))
+            if invalid:
+                return FlaskStyleJSONResponse({"error": f"Datasets inválidos: {', '.join(invalid)}. Opções válidas são: {', '.join(DATASETS)}"}, status_code=400)
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        if request.method == "HEAD":
+            # Sem corpo, o stream nunca terminaria: responde sem ocupar uma conexão do limite
+            return Response(media_type="text/event-stream", headers=headers)
+
+        watcher.start()
+        try:
+            subscription = broker.subscribe(request.headers.get('Last-Event-ID') or None, loop=asyncio.get_running_loop())
+        except TooManySubscribers as e:
+            return FlaskStyleJSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": str(RETRY_MS // 1000)})
+        return EventStreamResponse(
+            stream(subscription, datasets),
+            lambda: broker.unsubscribe(subscription),
+            media_type="text/event-stream",
+            headers=headers,
+        )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        watcher.stop()
+        await scraper.aclose()
+
+    routes = [
+        Route('/', index),
+        Route('/api/production', get_production),
+        Route('/api/production/growth', get_production_growth),
+        Route('/api/processing', get_processing),
+        Route('/api/processing/{category}', get_processing_by_category),
+        Route('/api/commercialization', get_commercialization),
+        Route('/api/import', get_import),
+        Route('/api/import/{category}', get_import_by_category),
+        Route('/api/import/{category}/yoy', get_import_yoy),
+        Route('/api/import/{category}/shares', get_import_shares),
+        Route('/api/export', get_export),
+        Route('/api/export/{category}', get_export_by_category),
+        Route('/api/export/{category}/yoy', get_export_yoy),
+        Route('/api/export/{category}/shares', get_export_shares),
+        Route('/api/trade-balance', get_trade_balance),
+        Route('/api/batch', post_batch, methods=['POST']),
+        Route('/api/events', get_events),
+        Route('/metrics', get_metrics),
+    ]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    labels = {route.endpoint: route.path.replace("{", "<").replace("}", ">") for route in routes}
+    app.add_middleware(RequestTimer, labels=labels)
+    return app
@@ -0,0 +1,182 @@
+"""
+Batch routes for the API.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+import contextvars
+import time
+
+from flask import Flask, jsonify, request
+from scraper import VitiBrasilScraper
+from scraper.datasets import DATASETS
+from scraper.deadline import DeadlineExceeded, expired, remaining
+
+# Maximum number of lookups accepted in a single batch
+MAX_BATCH_SIZE = 50
+
+BatchKey = Tuple[str, Optional[str], Optional[int]]
+
+
+class BatchError(ValueError):
+    """Raised when the batch body itself is malformed."""
+
+
+def parse_batch(body) -> List[Union[BatchKey, Dict]]:
+    """
+    Validate a batch body and turn each spec into a lookup key.
+
+    The body is either a list of specs or an object with a "requests" list.
+    Each spec is an object with a "dataset" string and optional "category"
+    string and "year" (an integer or a numeric string).
+
+    Returns:
+        One entry per spec, in order: a (dataset, category, year) key, or an
+        {"error": ...} dict for an invalid spec.
+
+    Raises:
+        BatchError: If the body is not a list of specs or is too large.
+    """
+    specs = body.get("requests") if isinstance(body, dict) else body
+    if not isinstance(specs, list):
+        raise BatchError('Esperada uma lista JSON de consultas ou um objeto com a lista "requests"')
+    if len(specs) > MAX_BATCH_SIZE:
+        raise BatchError(f"Um lote aceita no máximo {MAX_BATCH_SIZE} consultas, recebidas {len(specs)}")
+
+    entries = []
+    for spec in specs:
+        if not isinstance(spec, dict):
+            entries.append({"error": "Cada consulta deve ser um objeto"})
+            continue
+        dataset = spec.get("dataset")
+        dataset = DATASETS.get(dataset) if isinstance(dataset, str) else None
+        if dataset is None:
+            entries.append({"error": f"Dataset inválido: {spec.get('dataset')}. Opções válidas são: {', '.join(DATASETS)}"})
+            continue
+        category = spec.get("category")
+        if category is not None and not isinstance(category, str):
+            entries.append({"error": f"Categoria inválida: {category}. Use o nome da categoria como texto"})
+            continue
+        year = spec.get("year")
+        # bool é subclasse de int, mas true/false não são anos
+        if isinstance(year, bool) or not isinstance(year, (int, str, type(None))):
+            entries.append({"error": f"Ano inválido: {year}"})
+            continue
+        try:
+            year = int(year) if year is not None else None
+        except ValueError:
+            entries.append({"error": f"Ano inválido: {year}"})
+            continue
+        entries.append((dataset.name, category, year))
+    return entries
+
+
+def lookup_deadline() -> Optional[float]:
+    """The request deadline as a time.monotonic() instant, or None without one."""
+    left = remaining()
+    return None if left is None else time.monotonic() + left
+
+
+def can_join(inflight_deadline: Optional[float], deadline: Optional[float]) -> bool:
+    """
+    Whether a request may wait on a lookup already in flight instead of starting its own.
+
+    A lookup runs under the deadline of the request that started it, so it is
+    only shared with requests it will not give up before: a short
+    X-Request-Timeout never makes the lookups of other requests fail.
+    """
+    return inflight_deadline is None or (deadline is not None and inflight_deadline >= deadline)
+
+
+def register_batch_routes(app: Flask, max_workers: int = 8):
+    """Register batch routes."""
+
+    # Initialize the scraper
+    scraper = VitiBrasilScraper()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vitibrasil-batch")
+
+    # Lookups in flight and the deadline each runs under, shared across concurrent batches
+    # so identical lookups run once (see can_join)
+    inflight: Dict[BatchKey, Tuple[Future, Optional[float]]] = {}
+    inflight_lock = Lock()
+
+    def fetch(key: BatchKey) -> Dict:
+        dataset, category, year = key
+        return DATASETS[dataset].fetch(scraper, category=category, year=year)
+
+    def submit(key: BatchKey) -> Future:
+        deadline = lookup_deadline()
+        with inflight_lock:
+            future, inflight_deadline = inflight.get(key, (None, None))
+            if future is not None and not future.done() and can_join(inflight_deadline, deadline):
+                return future
+            # The lookup runs under this request's deadline
+            future = executor.submit(contextvars.copy_context().run, fetch, key)
+            inflight[key] = (future, deadline)
+        # Outside the lock: the callback runs immediately if the lookup already finished
+        future.add_done_callback(lambda done: release(key, done))
+        return future
+
+    def release(key: BatchKey, future: Future):
+        with inflight_lock:
+            if inflight.get(key, (None, None))[0] is future:
+                del inflight[key]
+
+    def result(key: BatchKey, future: Future) -> Dict:
+        """Wait for a lookup until the request deadline."""
+        while True:
+            left = remaining()
+            try:
+                return future.result(timeout=None if left is None else max(left, 0))
+            except DeadlineExceeded:
+                # A shared lookup that ran out of time while this request still has some is retried
+                if expired():
+                    raise
+                future = submit(key)
+            except FutureTimeoutError:
+                raise DeadlineExceeded()
+
+    @app.route('/api/batch', methods=['POST'])
+    def post_batch():
+        """
+        Resolve many dataset/category/year lookups in one round trip.
+
+        Body:
+            {"requests": [{"dataset": "import", "category": "vinhos_mesa", "year": 2020}, ...]}
+
+            dataset: production, processing, commercialization, import or export
+            category (optional): The category; omitted means all categories
+            year (optional): The year to get data for
+
+        Returns:
+            {"results": [...]} with one entry per lookup, in order. Each entry is
+            the lookup data or an {"error": ...} object. "partial": true is added
+            when the request deadline ran out before some lookups finished.
+        """
+        try:
+            entries = parse_batch(request.get_json(silent=True))
+        except BatchError as e:
+            return jsonify({"error": str(e)}), 400
+
+        futures = {entry: submit(entry) for entry in entries if isinstance(entry, tuple)}
+
+        results = []
+        partial = False
+        for entry in entries:
+            if isinstance(entry, dict):
+                results.append(entry)
+                continue
+            try:
+                data = result(entry, futures[entry])
+                partial = partial or bool(data.get("partial"))
+                results.append(data)
+            except DeadlineExceeded as e:
+                partial = True
+                results.append({"error": str(e)})
+            except Exception as e:
+                results.append({"error": str(e)})
+        if partial:
+            return jsonify({"results": results, "partial": True})
+        return jsonify({"results": results})
@@ -0,0 +1,89 @@
+"""
+Cache em memória para respostas da API.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+import time
+
+from scraper import metrics
+
+
+class LRUCache:
+    """Cache LRU thread-safe com expiração opcional por entrada."""
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None, name: str = "default"):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Número máximo de entradas mantidas em memória
+            ttl: Tempo de vida das entradas em segundos. Se None, as entradas não expiram.
+            name: Nome do cache nas métricas
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor associado à chave ou None se ausente ou expirado."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._record("hit")
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            self._record("miss")
+            return None
+
+    def _record(self, result: str) -> None:
+        if not metrics.REGISTRY.enabled:
+            return
+        metrics.CACHE_REQUESTS.inc(cache=self.name, result=result)
+        metrics.CACHE_HIT_RATIO.set(self.hits / (self.hits + self.misses), cache=self.name)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor, descartando a entrada menos usada se o cache estiver cheio.
+
+        Args:
+            key: A chave
+            value: O valor
+            ttl: Tempo de vida desta entrada em segundos; se None, vale o ttl do cache
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedPayload:
+    """Corpo de uma resposta em cache, com as variantes comprimidas guardadas ao lado dos bytes originais."""
+
+    __slots__ = ("raw", "mimetype", "variants")
+
+    def __init__(self, raw: bytes, mimetype: str):
+        self.raw = raw
+        self.mimetype = mimetype
+        self.variants: Dict[str, bytes] = {}
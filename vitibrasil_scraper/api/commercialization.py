@@ -4,6 +4,7 @@ Commercialization routes for the API.
 
 from flask import Flask, jsonify, request
 from scraper import VitiBrasilScraper
+from scraper.deadline import DeadlineExceeded
 
 def register_commercialization_routes(app: Flask):
     """Register commercialization routes."""
@@ -26,5 +27,7 @@ def register_commercialization_routes(app: Flask):
                 year = int(year)
             data = scraper.get_commercialization_data(year=year)
             return jsonify(data)
+        except DeadlineExceeded as e:
+            return jsonify({"error": str(e)}), 504
         except Exception as e:
             return jsonify({"error": str(e)}), 500 
\ No newline at end of file
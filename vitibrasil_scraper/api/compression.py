@@ -0,0 +1,139 @@
+"""
+Compressão das respostas da API com negociação via Accept-Encoding.
+
+Respostas de anos históricos são guardadas em cache já comprimidas, de forma
+que cada payload é comprimido uma única vez e servido muitas vezes.
+"""
+
+import gzip
+import io
+from typing import Optional
+
+from flask import Flask, Response, g, request
+
+from scraper.datasets import is_historical_year
+
+from .cache import CachedPayload, LRUCache
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele apenas gzip é oferecido
+    brotli = None
+
+# Respostas menores que isso não compensam o custo de compressão
+MIN_SIZE = 500
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+# Níveis usados para respostas dinâmicas (comprimidas a cada requisição)
+# e para respostas em cache (comprimidas uma vez e reaproveitadas)
+DYNAMIC_LEVELS = {"br": 5, "gzip": 6}
+CACHED_LEVELS = {"br": 11, "gzip": 9}
+
+CACHE_EXTENSION = "vitibrasil_response_cache"
+
+
+def supported_encodings() -> list:
+    """Retorna as codificações suportadas, em ordem de preferência do servidor."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Comprime um payload com a codificação informada.
+
+    Args:
+        data: Os bytes a comprimir
+        encoding: 'br' ou 'gzip'
+        level: Nível de compressão
+
+    Returns:
+        Os bytes comprimidos.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "gzip":
+        # gzip.compress só aceita mtime a partir do Python 3.8
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=level, mtime=0) as f:
+            f.write(data)
+        return buffer.getvalue()
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Escolhe a melhor codificação aceita pelo cliente da requisição atual."""
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def _is_cacheable_request() -> bool:
+    return (
+        request.method == "GET"
+        and request.path.startswith("/api/")
+        and is_historical_year(request.args.get("year"))
+    )
+
+
+def _encode_cached_payload(response: Response, payload: CachedPayload) -> Response:
+    """Preenche a resposta com a variante do payload em cache adequada ao cliente."""
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding()
+    if encoding and len(payload.raw) >= MIN_SIZE:
+        body = payload.variants.get(encoding)
+        if body is None:
+            body = compress(payload.raw, encoding, CACHED_LEVELS[encoding])
+            payload.variants[encoding] = body
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def register_compression(app: Flask, max_cached_responses: int = 256):
+    """
+    Registra a compressão de respostas e o cache de respostas históricas.
+
+    Args:
+        app: A aplicação Flask
+        max_cached_responses: Número máximo de respostas históricas mantidas em cache
+    """
+    cache = LRUCache(max_entries=max_cached_responses, name="responses")
+    app.extensions[CACHE_EXTENSION] = cache
+
+    @app.before_request
+    def serve_cached_response():
+        """Serve respostas históricas direto do cache, sem executar o scraper."""
+        if not _is_cacheable_request():
+            return None
+        payload = cache.get(request.full_path)
+        if payload is None:
+            return None
+        g.served_from_cache = True
+        return _encode_cached_payload(Response(payload.raw, mimetype=payload.mimetype), payload)
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        """Comprime a resposta conforme o Accept-Encoding e guarda respostas históricas."""
+        if g.get("served_from_cache"):
+            return response
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code != 200
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        # Respostas com erros parciais (ex.: uma categoria que falhou) não são guardadas
+        if _is_cacheable_request() and b'"error":' not in response.get_data():
+            payload = CachedPayload(response.get_data(), response.mimetype)
+            cache.set(request.full_path, payload)
+            return _encode_cached_payload(response, payload)
+
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding()
+        data = response.get_data()
+        if encoding and len(data) >= MIN_SIZE:
+            response.set_data(compress(data, encoding, DYNAMIC_LEVELS[encoding]))
+            response.headers["Content-Encoding"] = encoding
+        return response
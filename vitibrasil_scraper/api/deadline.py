@@ -0,0 +1,77 @@
+"""
+Prazo de cada requisição da API, propagado ao scraper por scraper.deadline.
+
+O prazo vem da configuração e do cabeçalho 'X-Request-Timeout' (segundos); com
+os dois, vale o menor, de modo que o cliente só pode encurtar o prazo do
+servidor:
+    VITIBRASIL_DEADLINE:        prazo padrão das rotas, em segundos (ou a variável de ambiente de mesmo nome)
+    VITIBRASIL_ROUTE_DEADLINES: prazos por rota, ex.: {"/api/export": 20, "/api/batch": 30}
+
+Esgotado o prazo, as rotas de uma única tabela respondem 504, e as de todas
+as categorias (e os lotes) respondem com as partes obtidas e "partial": true.
+"""
+
+from typing import Mapping, Optional
+import os
+
+from flask import Flask, g, jsonify, request
+
+from scraper.deadline import reset_deadline, set_deadline
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+def default_deadline() -> Optional[float]:
+    """Prazo padrão da variável de ambiente VITIBRASIL_DEADLINE, ou None."""
+    value = os.environ.get("VITIBRASIL_DEADLINE")
+    return float(value) if value else None
+
+
+def request_deadline(headers: Mapping[str, str], configured: Optional[float]) -> Optional[float]:
+    """
+    Calcula o prazo de uma requisição.
+
+    Args:
+        headers: Os cabeçalhos da requisição
+        configured: O prazo configurado para a rota, ou None
+
+    Returns:
+        O menor entre o prazo do cabeçalho e o configurado, ou None sem nenhum dos dois.
+
+    Raises:
+        ValueError: Se o cabeçalho não for um número positivo de segundos
+    """
+    value = headers.get(DEADLINE_HEADER)
+    if not value:
+        return configured
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0
+    if not seconds > 0:
+        raise ValueError(f"Valor inválido para {DEADLINE_HEADER}: {value}. Use um número positivo de segundos")
+    return seconds if configured is None else min(seconds, configured)
+
+
+def register_deadlines(app: Flask):
+    """Registra a definição do prazo de cada requisição conforme a configuração da aplicação."""
+    default = app.config.get("VITIBRASIL_DEADLINE")
+    if default is None:
+        default = default_deadline()
+    by_route = app.config.get("VITIBRASIL_ROUTE_DEADLINES") or {}
+
+    @app.before_request
+    def start_deadline():
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        try:
+            seconds = request_deadline(request.headers, by_route.get(rule, default))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if seconds is not None:
+            g.deadline_token = set_deadline(seconds)
+
+    @app.teardown_request
+    def end_deadline(exc):
+        token = g.pop("deadline_token", None)
+        if token is not None:
+            reset_deadline(token)
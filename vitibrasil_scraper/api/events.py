@@ -0,0 +1,115 @@
+"""
+Server-Sent Events stream of data change notices.
+
+Each open stream holds a worker thread for as long as the client stays
+connected, so the number of streams per worker is capped by
+VITIBRASIL_EVENTS_MAX_SUBSCRIBERS (503 above it), leaving threads for the
+other routes. The ASGI variant (api.asgi) serves the same stream without a
+thread per connection.
+"""
+
+from threading import Lock
+from typing import Dict, Iterator, Optional, Set
+import json
+
+from flask import Flask, Response, jsonify, request
+from scraper.changes import ChangeBroker, ChangeWatcher, Subscription, TooManySubscribers
+from scraper.datasets import DATASETS
+
+from .snapshot import SNAPSHOT_EXTENSION
+
+EVENTS_EXTENSION = "vitibrasil_events"
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15.0
+
+# Reconnection delay suggested to clients, in milliseconds
+RETRY_MS = 5000
+
+# Open streams per worker when VITIBRASIL_EVENTS_MAX_SUBSCRIBERS is not set
+DEFAULT_MAX_SUBSCRIBERS = 16
+
+
+def format_event(event: Dict) -> str:
+    """Format a change notice as a Server-Sent Events message."""
+    data = json.dumps(event, separators=(",", ":"), sort_keys=True)
+    return f"id: {event['id']}\nevent: change\ndata: {data}\n\n"
+
+
+def register_event_routes(app: Flask):
+    """Register the change notice stream."""
+
+    broker = ChangeBroker(max_subscribers=app.config.get("VITIBRASIL_EVENTS_MAX_SUBSCRIBERS") or DEFAULT_MAX_SUBSCRIBERS)
+    app.extensions[EVENTS_EXTENSION] = broker
+
+    # The watcher starts with the first subscriber, so apps nobody listens to never refresh
+    watcher: Optional[ChangeWatcher] = None
+    watcher_lock = Lock()
+
+    def ensure_watcher():
+        nonlocal watcher
+        with watcher_lock:
+            if watcher is None:
+                watcher = ChangeWatcher(
+                    broker,
+                    interval=float(app.config.get("VITIBRASIL_EVENTS_INTERVAL", 300)),
+                    snapshot_reader=app.extensions.get(SNAPSHOT_EXTENSION),
+                )
+            watcher.start()
+
+    def stream(subscription: Subscription, datasets: Optional[Set[str]]) -> Iterator[str]:
+        yield f"retry: {RETRY_MS}\n\n"
+        if subscription.missed is None:
+            # Notices were lost while disconnected: the client should refetch what it follows
+            yield "event: reset\ndata: {}\n\n"
+        for event in subscription.missed or []:
+            if datasets is None or event["dataset"] in datasets:
+                yield format_event(event)
+        while True:
+            event = subscription.get(timeout=HEARTBEAT_INTERVAL)
+            if event is None:
+                if subscription.closed:
+                    return
+                yield ": keep-alive\n\n"
+            elif datasets is None or event["dataset"] in datasets:
+                yield format_event(event)
+
+    @app.route('/api/events', methods=['GET'])
+    def get_events():
+        """
+        Stream a notice whenever a refresh detects that a table changed.
+
+        Query Parameters:
+            dataset (optional): Comma-separated datasets to follow; all by default.
+
+        Headers:
+            Last-Event-ID (optional): Sent by the browser on reconnection; the
+                notices missed since then are replayed, or a 'reset' event is sent
+                if they are no longer available.
+
+        Returns:
+            A text/event-stream with 'change' events whose data is
+            {"id", "dataset", "category", "year", "hash", "detected_at"};
+            503 if the worker already has its maximum of open streams.
+        """
+        datasets = None
+        if request.args.get('dataset'):
+            datasets = {name.strip() for name in request.args['dataset'].split(",") if name.strip()}
+            invalid = sorted(datasets - set(DATASETS))
+            if invalid:
+                return jsonify({"error": f"Datasets inválidos: {', '.join(invalid)}. Opções válidas são: {', '.join(DATASETS)}"}), 400
+
+        last_event_id = request.headers.get('Last-Event-ID') or None
+        ensure_watcher()
+        try:
+            subscription = broker.subscribe(last_event_id)
+        except TooManySubscribers as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(RETRY_MS // 1000)}
+        response = Response(
+            stream(subscription, datasets),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        # Released when the server closes the response, even if the body is never read (e.g. HEAD)
+        response.call_on_close(lambda: broker.unsubscribe(subscription))
+        return response
@@ -4,6 +4,11 @@ Import routes for the API.
 
 from flask import Flask, jsonify, request
 from scraper import VitiBrasilScraper
+from scraper.deadline import DeadlineExceeded
+from scraper.imports import IMPORT_CATEGORIES
+
+from .query import QueryError, TradeQuery
+from .snapshot import rollup_response
 
 def register_import_routes(app: Flask):
     """Register import routes."""
@@ -18,14 +23,21 @@ def register_import_routes(app: Flask):
         
         Query Parameters:
             year (optional): The year to get data for.
+            fields, country, drop_null, sort, top, footnotes (optional):
+                Filter, project and trim the countries; see api.query.TradeQuery.
         """
         year = request.args.get('year')
         
+        try:
+            query = TradeQuery.from_args(request.args)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
+        
         try:
             if year:
                 year = int(year)
             data = scraper.get_all_import_data(year=year)
-            return jsonify(data)
+            return jsonify(query.apply_all(data))
         except Exception as e:
             return jsonify({"error": str(e)}), 500
     
@@ -44,15 +56,54 @@ def register_import_routes(app: Flask):
             
         Query Parameters:
             year (optional): The year to get data for.
+            fields, country, drop_null, sort, top, footnotes (optional):
+                Filter, project and trim the countries; see api.query.TradeQuery.
         """
         year = request.args.get('year')
         
+        try:
+            query = TradeQuery.from_args(request.args)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
+        
         try:
             if year:
                 year = int(year)
             data = scraper.get_import_data(category=category, year=year)
-            return jsonify(data)
+            return jsonify(query.apply(data))
+        except DeadlineExceeded as e:
+            return jsonify({"error": str(e)}), 504
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
-            return jsonify({"error": str(e)}), 500 
\ No newline at end of file
+            return jsonify({"error": str(e)}), 500
+    
+    @app.route('/api/import/<category>/yoy', methods=['GET'])
+    def get_import_yoy(category):
+        """
+        Get yearly totals and year-over-year change for an import category.
+        
+        Served from the rollups materialized when the snapshot is built.
+        """
+        if category not in IMPORT_CATEGORIES:
+            return jsonify({"error": f"Categoria inválida: {category}. Opções válidas são: {', '.join(IMPORT_CATEGORIES)}"}), 400
+        return rollup_response("import.yoy", category)
+    
+    @app.route('/api/import/<category>/shares', methods=['GET'])
+    def get_import_shares(category):
+        """
+        Get each country's share of the total quantity and value for an import category.
+        
+        Served from the rollups materialized when the snapshot is built.
+        
+        Query Parameters:
+            year (optional): The year to get data for.
+        """
+        if category not in IMPORT_CATEGORIES:
+            return jsonify({"error": f"Categoria inválida: {category}. Opções válidas são: {', '.join(IMPORT_CATEGORIES)}"}), 400
+        year = request.args.get('year')
+        try:
+            year = int(year) if year else None
+        except ValueError:
+            return jsonify({"error": f"Ano inválido: {year}"}), 400
+        return rollup_response("import.shares", category, year)
\ No newline at end of file
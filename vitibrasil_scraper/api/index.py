@@ -4,82 +4,172 @@ Rota de índice para a API.
 
 from flask import Flask, jsonify
 
+# Parâmetros de filtragem das rotas de importação e exportação (api.query)
+TRADE_QUERY_PARAMETERS = [
+    {"name": "fields", "type": "string", "required": False, "description": "Campos dos países separados por vírgula (name, quantity, value)"},
+    {"name": "country", "type": "string", "required": False, "description": "Países a manter, separados por vírgula (sem diferenciar acentos e maiúsculas)"},
+    {"name": "drop_null", "type": "boolean", "required": False, "description": "Remover países sem quantidade e sem valor"},
+    {"name": "sort", "type": "string", "required": False, "description": "Campo de ordenação dos países; prefixo '-' para ordem decrescente"},
+    {"name": "top", "type": "integer", "required": False, "description": "Manter apenas os N primeiros países (por -value, se sort não for informado)"},
+    {"name": "footnotes", "type": "boolean", "required": False, "description": "false para omitir as notas de rodapé"}
+]
+
+# Descrição da API retornada pela rota de índice
+API_INFO = {
+    "name": "API VitiBrasil",
+    "version": "0.1.0",
+    "endpoints": [
+        {
+            "path": "/api/production",
+            "methods": ["GET"],
+            "description": "Obter dados de produção de vinho",
+            "parameters": [
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
+            ]
+        },
+        {
+            "path": "/api/processing",
+            "methods": ["GET"],
+            "description": "Obter dados de processamento de uvas para todas as categorias",
+            "parameters": [
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
+            ]
+        },
+        {
+            "path": "/api/processing/<category>",
+            "methods": ["GET"],
+            "description": "Obter dados de processamento de uvas para uma categoria específica",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de uva (viniferas, americanas, mesa, sem_classificacao)"},
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
+            ]
+        },
+        {
+            "path": "/api/commercialization",
+            "methods": ["GET"],
+            "description": "Obter dados de comercialização para vinhos e derivados",
+            "parameters": [
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
+            ]
+        },
+        {
+            "path": "/api/import",
+            "methods": ["GET"],
+            "description": "Obter dados de importação para todas as categorias de produtos vitivinícolas",
+            "parameters": [
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"},
+                *TRADE_QUERY_PARAMETERS
+            ]
+        },
+        {
+            "path": "/api/import/<category>",
+            "methods": ["GET"],
+            "description": "Obter dados de importação para uma categoria específica de produtos vitivinícolas",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de importação (table_wines, sparkling_wines, fresh_grapes, raisins, grape_juice)"},
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"},
+                *TRADE_QUERY_PARAMETERS
+            ]
+        },
+        {
+            "path": "/api/export",
+            "methods": ["GET"],
+            "description": "Obter dados de exportação para todas as categorias de produtos vitivinícolas",
+            "parameters": [
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"},
+                *TRADE_QUERY_PARAMETERS
+            ]
+        },
+        {
+            "path": "/api/export/<category>",
+            "methods": ["GET"],
+            "description": "Obter dados de exportação para uma categoria específica de produtos vitivinícolas",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de exportação (table_wines, sparkling_wines, fresh_grapes, grape_juice)"},
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"},
+                *TRADE_QUERY_PARAMETERS
+            ]
+        },
+        {
+            "path": "/api/import/<category>/yoy",
+            "methods": ["GET"],
+            "description": "Obter os totais anuais de uma categoria de importação e sua variação ano a ano (requer snapshot)",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de importação"}
+            ]
+        },
+        {
+            "path": "/api/import/<category>/shares",
+            "methods": ["GET"],
+            "description": "Obter a participação de cada país no total de uma categoria de importação (requer snapshot)",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de importação"},
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
+            ]
+        },
+        {
+            "path": "/api/export/<category>/yoy",
+            "methods": ["GET"],
+            "description": "Obter os totais anuais de uma categoria de exportação e sua variação ano a ano (requer snapshot)",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de exportação"}
+            ]
+        },
+        {
+            "path": "/api/export/<category>/shares",
+            "methods": ["GET"],
+            "description": "Obter a participação de cada país no total de uma categoria de exportação (requer snapshot)",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria de exportação"},
+                {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
+            ]
+        },
+        {
+            "path": "/api/production/growth",
+            "methods": ["GET"],
+            "description": "Obter a variação ano a ano de cada produto e do total da produção (requer snapshot)",
+            "parameters": []
+        },
+        {
+            "path": "/api/trade-balance",
+            "methods": ["GET"],
+            "description": "Obter o saldo comercial (exportado menos importado) de uma categoria por país, em um intervalo de anos",
+            "parameters": [
+                {"name": "category", "type": "string", "required": True, "description": "Categoria presente em importação e exportação (vinhos_mesa, espumantes, uvas_frescas, suco_uva)"},
+                {"name": "start", "type": "integer", "required": False, "description": "Primeiro ano do intervalo"},
+                {"name": "end", "type": "integer", "required": False, "description": "Último ano do intervalo; sem start e end, o último ano disponível"}
+            ]
+        },
+        {
+            "path": "/api/batch",
+            "methods": ["POST"],
+            "description": "Obter várias combinações de dataset, categoria e ano em uma única requisição",
+            "parameters": [
+                {"name": "requests", "type": "array", "required": True, "description": "Lista de consultas {dataset, category, year}; dataset: production, processing, commercialization, import ou export"}
+            ]
+        },
+        {
+            "path": "/api/events",
+            "methods": ["GET"],
+            "description": "Stream (Server-Sent Events) com um aviso {dataset, category, year, hash} sempre que uma tabela muda",
+            "parameters": [
+                {"name": "dataset", "type": "string", "required": False, "description": "Datasets acompanhados, separados por vírgula; todos por padrão"}
+            ]
+        },
+        {
+            "path": "/metrics",
+            "methods": ["GET"],
+            "description": "Obter métricas no formato do Prometheus (requer VITIBRASIL_METRICS=1 ou --metrics)",
+            "parameters": []
+        }
+    ]
+}
+
+
 def register_index_route(app: Flask):
     """Registra a rota de índice."""
     
     @app.route('/')
     def index():
         """Retorna informações da API."""
-        return jsonify({
-            "name": "API VitiBrasil",
-            "version": "0.1.0",
-            "endpoints": [
-                {
-                    "path": "/api/production",
-                    "methods": ["GET"],
-                    "description": "Obter dados de produção de vinho",
-                    "parameters": [
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/processing",
-                    "methods": ["GET"],
-                    "description": "Obter dados de processamento de uvas para todas as categorias",
-                    "parameters": [
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/processing/<category>",
-                    "methods": ["GET"],
-                    "description": "Obter dados de processamento de uvas para uma categoria específica",
-                    "parameters": [
-                        {"name": "category", "type": "string", "required": True, "description": "Categoria de uva (viniferas, americanas, mesa, sem_classificacao)"},
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/commercialization",
-                    "methods": ["GET"],
-                    "description": "Obter dados de comercialização para vinhos e derivados",
-                    "parameters": [
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/import",
-                    "methods": ["GET"],
-                    "description": "Obter dados de importação para todas as categorias de produtos vitivinícolas",
-                    "parameters": [
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/import/<category>",
-                    "methods": ["GET"],
-                    "description": "Obter dados de importação para uma categoria específica de produtos vitivinícolas",
-                    "parameters": [
-                        {"name": "category", "type": "string", "required": True, "description": "Categoria de importação (table_wines, sparkling_wines, fresh_grapes, raisins, grape_juice)"},
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/export",
-                    "methods": ["GET"],
-                    "description": "Obter dados de exportação para todas as categorias de produtos vitivinícolas",
-                    "parameters": [
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                },
-                {
-                    "path": "/api/export/<category>",
-                    "methods": ["GET"],
-                    "description": "Obter dados de exportação para uma categoria específica de produtos vitivinícolas",
-                    "parameters": [
-                        {"name": "category", "type": "string", "required": True, "description": "Categoria de exportação (table_wines, sparkling_wines, fresh_grapes, grape_juice)"},
-                        {"name": "year", "type": "integer", "required": False, "description": "Ano para obter os dados"}
-                    ]
-                }
-            ]
-        }) 
\ No newline at end of file
+        return jsonify(API_INFO)
@@ -0,0 +1,60 @@
+"""
+Rota de métricas e instrumentação das requisições da API.
+"""
+
+import time
+
+from flask import Flask, Response, g, has_request_context, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+from scraper import metrics, profiling
+
+
+def _route_label() -> str:
+    """Retorna o padrão da rota da requisição atual, para não gerar um label por URL."""
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return "unmatched"
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Provedor JSON que mede o tempo de serialização das respostas para as métricas e o perfil ativo."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.SERIALIZATION_SECONDS.observe(elapsed, route=_route_label())
+            profiling.record("serialize", elapsed)
+
+
+def register_metrics_route(app: Flask):
+    """Registra a rota /metrics e a medição de latência por rota."""
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        if metrics.REGISTRY.enabled:
+            g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = g.get("request_started")
+        if started is not None:
+            metrics.REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                route=_route_label(),
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    @app.route('/metrics')
+    def get_metrics():
+        """Retorna as métricas no formato texto do Prometheus."""
+        if not metrics.REGISTRY.enabled:
+            return jsonify({"error": "Métricas desabilitadas. Defina VITIBRASIL_METRICS=1 ou use a opção --metrics."}), 404
+        return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
@@ -4,6 +4,7 @@ Processing routes for the API.
 
 from flask import Flask, jsonify, request
 from scraper import VitiBrasilScraper
+from scraper.deadline import DeadlineExceeded
 
 def register_processing_routes(app: Flask):
     """Register processing routes."""
@@ -47,6 +48,8 @@ def register_processing_routes(app: Flask):
                 year = int(year)
             data = scraper.get_processing_data(category=category, year=year)
             return jsonify(data)
+        except DeadlineExceeded as e:
+            return jsonify({"error": str(e)}), 504
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
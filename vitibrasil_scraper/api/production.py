@@ -4,6 +4,9 @@ Production routes for the API.
 
 from flask import Flask, jsonify, request
 from scraper import VitiBrasilScraper
+from scraper.deadline import DeadlineExceeded
+
+from .snapshot import rollup_response
 
 def register_production_routes(app: Flask):
     """Register production routes."""
@@ -26,5 +29,16 @@ def register_production_routes(app: Flask):
                 year = int(year)
             data = scraper.get_production_data(year=year)
             return jsonify(data)
+        except DeadlineExceeded as e:
+            return jsonify({"error": str(e)}), 504
         except Exception as e:
-            return jsonify({"error": str(e)}), 500 
\ No newline at end of file
+            return jsonify({"error": str(e)}), 500
+    
+    @app.route('/api/production/growth', methods=['GET'])
+    def get_production_growth():
+        """
+        Get the year-over-year growth of each product and of the total production.
+        
+        Served from the rollups materialized when the snapshot is built.
+        """
+        return rollup_response("production.growth")
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Perfilamento das requisições da API.
+
+O perfilamento é ativado pela configuração VITIBRASIL_PROFILE:
+    "all":    perfila todas as requisições
+    "header": perfila apenas requisições com o cabeçalho 'X-Profile: 1'
+"""
+
+from contextlib import ExitStack
+
+from flask import Flask, g, request
+
+from scraper.profiling import Profiler
+
+PROFILE_HEADER = "X-Profile"
+PROFILER_EXTENSION = "vitibrasil_profiler"
+
+
+def register_profiling(app: Flask):
+    """Registra o perfilamento das requisições conforme a configuração da aplicação."""
+    mode = app.config.get("VITIBRASIL_PROFILE")
+    if not mode:
+        return
+    if mode not in ("all", "header"):
+        raise ValueError(f"Valor inválido para VITIBRASIL_PROFILE: {mode}. Opções válidas são: all, header")
+
+    profiler = Profiler(
+        output_dir=app.config.get("VITIBRASIL_PROFILE_DIR", "profiles"),
+        mode=app.config.get("VITIBRASIL_PROFILE_MODE", "sampling"),
+    )
+    app.extensions[PROFILER_EXTENSION] = profiler
+
+    @app.before_request
+    def start_profile():
+        if mode == "header" and request.headers.get(PROFILE_HEADER) != "1":
+            return
+        label = request.url_rule.rule if request.url_rule is not None else request.path
+        stack = ExitStack()
+        stack.enter_context(profiler.profile(label))
+        g.profile_stack = stack
+
+    @app.teardown_request
+    def finish_profile(exc):
+        stack = g.pop("profile_stack", None)
+        if stack is not None:
+            stack.close()
@@ -0,0 +1,137 @@
+"""
+Query parameters for filtering, projecting and trimming import/export tables.
+"""
+
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from scraper.rollups import normalize_country
+
+# Country fields that can be projected with 'fields'
+COUNTRY_FIELDS = ("name", "quantity", "value")
+
+# Query parameters understood by the import/export routes, besides 'year'
+QUERY_PARAMS = frozenset({"fields", "country", "drop_null", "sort", "top", "footnotes"})
+
+_TRUE = {"1", "true", "yes"}
+_FALSE = {"0", "false", "no"}
+
+
+class QueryError(ValueError):
+    """Raised when a query parameter is invalid."""
+
+
+def _parse_bool(args, name: str, default: bool) -> bool:
+    value = args.get(name)
+    if value is None:
+        return default
+    if value.lower() in _TRUE:
+        return True
+    if value.lower() in _FALSE:
+        return False
+    raise QueryError(f"Valor inválido para {name}: {value}. Use true ou false")
+
+
+class TradeQuery(NamedTuple):
+    """Filtering, projection and top-N options for the countries of a trade table."""
+
+    fields: Optional[Tuple[str, ...]] = None
+    countries: Optional[FrozenSet[str]] = None
+    drop_null: bool = False
+    sort: Optional[str] = None
+    descending: bool = False
+    top: Optional[int] = None
+    footnotes: bool = True
+
+    @classmethod
+    def from_args(cls, args) -> "TradeQuery":
+        """
+        Build the options from the request query parameters.
+
+        Query Parameters:
+            fields: Comma-separated country fields to return (name, quantity, value)
+            country: Comma-separated country names to keep (accents and case are ignored)
+            drop_null: true to drop countries with neither quantity nor value
+            sort: Field to sort countries by; prefix with '-' for descending order
+            top: Keep only the first N countries; without 'sort', sorts by -value
+            footnotes: false to omit the footnotes text
+
+        Raises:
+            QueryError: If a parameter is invalid.
+        """
+        fields = None
+        if args.get("fields"):
+            fields = tuple(field.strip() for field in args["fields"].split(",") if field.strip())
+            invalid = [field for field in fields if field not in COUNTRY_FIELDS]
+            if invalid:
+                raise QueryError(f"Campos inválidos: {', '.join(invalid)}. Opções válidas são: {', '.join(COUNTRY_FIELDS)}")
+
+        countries = None
+        if args.get("country"):
+            countries = frozenset(normalize_country(name) for name in args["country"].split(",") if name.strip())
+
+        top = args.get("top")
+        if top is not None:
+            try:
+                top = int(top)
+            except ValueError:
+                top = -1
+            if top < 1:
+                raise QueryError(f"Valor inválido para top: {args['top']}. Use um inteiro positivo")
+
+        sort = args.get("sort")
+        descending = False
+        if sort:
+            descending = sort.startswith("-")
+            sort = sort.lstrip("-")
+            if sort not in COUNTRY_FIELDS:
+                raise QueryError(f"Campo de ordenação inválido: {sort}. Opções válidas são: {', '.join(COUNTRY_FIELDS)}")
+        elif top is not None:
+            sort, descending = "value", True
+
+        return cls(
+            fields=fields,
+            countries=countries,
+            drop_null=_parse_bool(args, "drop_null", False),
+            sort=sort or None,
+            descending=descending,
+            top=top,
+            footnotes=_parse_bool(args, "footnotes", True),
+        )
+
+    def apply(self, data: Dict) -> Dict:
+        """
+        Apply the options to a single category table.
+
+        The totals are left untouched: they still refer to every country.
+
+        Returns:
+            A new dict; the given table is not modified.
+        """
+        countries = data["countries"]
+        if self.countries is not None:
+            countries = [country for country in countries if normalize_country(country["name"]) in self.countries]
+        if self.drop_null:
+            countries = [country for country in countries if country["quantity"] is not None or country["value"] is not None]
+        if self.sort is not None:
+            # Countries without a value for the sort field always come last
+            present = [country for country in countries if country[self.sort] is not None]
+            missing = [country for country in countries if country[self.sort] is None]
+            key = (lambda country: country["name"].casefold()) if self.sort == "name" else (lambda country: country[self.sort])
+            countries = sorted(present, key=key, reverse=self.descending) + missing
+        if self.top is not None:
+            countries = countries[:self.top]
+        if self.fields is not None:
+            countries = [{field: country[field] for field in self.fields} for country in countries]
+
+        result = dict(data, countries=countries)
+        if not self.footnotes:
+            result.pop("footnotes", None)
+        return result
+
+    def apply_all(self, data: Dict) -> Dict:
+        """Apply the options to every category of an all-categories result, skipping errors."""
+        categories = {
+            category: table if "error" in table else self.apply(table)
+            for category, table in data["categories"].items()
+        }
+        return dict(data, categories=categories)
@@ -0,0 +1,66 @@
+"""
+Servidor de produção para a API, com múltiplos processos e threads.
+
+Usa o Gunicorn embutido: a aplicação é criada uma vez no processo mestre
+(preload), e os workers herdam por fork o estado já inicializado, como as
+instâncias do scraper e as rotas registradas. SIGTERM encerra os workers de
+forma graciosa, aguardando as requisições em andamento.
+"""
+
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+
+def run_production_server(
+    app_factory: Callable[[], "Flask"],
+    host: str = "127.0.0.1",
+    port: int = 5000,
+    workers: int = 2,
+    threads: int = 4,
+    graceful_timeout: int = 30,
+    timeout: int = 60,
+):
+    """
+    Executa a API com o Gunicorn.
+
+    Args:
+        app_factory: Função que cria a aplicação Flask
+        host: Endereço onde a API será hospedada
+        port: Porta onde a API estará disponível
+        workers: Número de processos worker
+        threads: Número de threads por worker
+        graceful_timeout: Segundos que os workers têm para concluir as requisições ao encerrar
+        timeout: Segundos sem resposta após os quais um worker é reiniciado
+
+    Raises:
+        RuntimeError: Se o Gunicorn não estiver instalado
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        raise RuntimeError(
+            "O modo de produção requer o Gunicorn. Instale com: pip install 'vitibrasil_scraper[server]'"
+        ) from e
+
+    class _EmbeddedApplication(BaseApplication):
+        def load_config(self):
+            settings = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "threads": threads,
+                "worker_class": "gthread",
+                "preload_app": True,
+                "graceful_timeout": graceful_timeout,
+                "timeout": timeout,
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    # Com preload, a aplicação é criada antes do fork e compartilhada pelos workers
+    app = app_factory()
+    _EmbeddedApplication().run()
@@ -0,0 +1,119 @@
+"""
+Respostas da API servidas a partir do snapshot compartilhado.
+
+Ativado pela configuração VITIBRASIL_SNAPSHOT, com o caminho do arquivo
+publicado por 'vitibrasil snapshot'. Requisições de leitura cujos dados estão
+no snapshot são respondidas direto do mapeamento em memória, sem buscar o site
+da Embrapa (com os filtros de api.query aplicados, quando presentes); as demais
+seguem para as rotas normalmente.
+
+Os agregados de scraper.rollups (variação ano a ano, participação por país,
+crescimento da produção) existem apenas no snapshot e são servidos por
+rollup_response.
+"""
+
+from typing import Optional, Tuple, Union
+import json
+
+from flask import Flask, Response, current_app, jsonify, request
+
+from scraper.datasets import DATASETS
+from scraper.snapshot import SnapshotReader, snapshot_key
+
+from .query import QUERY_PARAMS, TradeQuery
+
+SNAPSHOT_EXTENSION = "vitibrasil_snapshot"
+
+# Rotas servidas pelo snapshot e o dataset de cada uma
+SNAPSHOT_ROUTES = {
+    "/api/production": "production",
+    "/api/processing": "processing",
+    "/api/processing/<category>": "processing",
+    "/api/commercialization": "commercialization",
+    "/api/import": "import",
+    "/api/import/<category>": "import",
+    "/api/export": "export",
+    "/api/export/<category>": "export",
+}
+
+
+def find_rollup(reader: Optional[SnapshotReader], name: str, category: Optional[str] = None,
+                year: Optional[int] = None) -> Tuple[Union[bytes, memoryview, dict], int]:
+    """
+    Busca um agregado materializado no snapshot, para as variantes Flask e ASGI da API.
+
+    Returns:
+        (o JSON do agregado, 200), ou ({"error": ...}, status) se não houver snapshot ou agregado.
+    """
+    snapshot = reader.current() if reader is not None else None
+    if snapshot is None:
+        return {"error": "Agregados disponíveis apenas com um snapshot publicado (VITIBRASIL_SNAPSHOT)"}, 503
+    raw = snapshot.raw(snapshot_key(name, category, year))
+    if raw is None:
+        return {"error": f"Agregado {name} não encontrado no snapshot para o ano {year if year else 'mais recente'}"}, 404
+    return raw, 200
+
+
+def rollup_response(name: str, category: Optional[str] = None, year: Optional[int] = None):
+    """
+    Responde com um agregado materializado no snapshot.
+
+    Args:
+        name: O nome do agregado (ex.: "export.yoy")
+        category: A categoria, para agregados por categoria
+        year: O ano, para agregados por ano; None para o último ano disponível
+    """
+    payload, status = find_rollup(current_app.extensions.get(SNAPSHOT_EXTENSION), name, category, year)
+    if status != 200:
+        return jsonify(payload), status
+    return Response([payload, b"\n"], mimetype="application/json")
+
+
+def register_snapshot(app: Flask):
+    """Registra o atendimento pelo snapshot conforme a configuração da aplicação."""
+    path = app.config.get("VITIBRASIL_SNAPSHOT")
+    if not path:
+        return
+
+    reader = SnapshotReader(path)
+    app.extensions[SNAPSHOT_EXTENSION] = reader
+
+    @app.before_request
+    def serve_from_snapshot():
+        if request.method != "GET" or request.url_rule is None:
+            return None
+        dataset = SNAPSHOT_ROUTES.get(request.url_rule.rule)
+        if dataset is None:
+            return None
+        # Além de 'year', só os parâmetros de api.query das rotas de importação/exportação
+        # são tratados aqui; as demais consultas seguem para as rotas
+        params = set(request.args) - {"year"}
+        if params and (dataset not in ("import", "export") or params - QUERY_PARAMS):
+            return None
+        snapshot = reader.current()
+        if snapshot is None:
+            return None
+
+        year = request.args.get("year")
+        try:
+            year = int(year) if year else None
+            query = TradeQuery.from_args(request.args) if params else None
+        except ValueError:
+            # A rota responde com o erro de validação
+            return None
+
+        category = request.view_args.get("category")
+        if category is None and DATASETS[dataset].categories is not None:
+            body = snapshot.compose_all(dataset, year)
+            if body is None:
+                return None
+            if query is not None:
+                return jsonify(query.apply_all(json.loads(body)))
+        else:
+            body = snapshot.raw(snapshot_key(dataset, category, year))
+            if body is None:
+                return None
+            if query is not None:
+                return jsonify(query.apply(json.loads(bytes(body))))
+
+        return Response([body, b"\n"], mimetype="application/json")
@@ -0,0 +1,238 @@
+"""
+Trade balance routes for the API.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import contextvars
+
+from flask import Flask, current_app, jsonify, request
+from scraper import VitiBrasilScraper
+from scraper.datasets import is_historical_year
+from scraper.deadline import DeadlineExceeded
+from scraper.exports import EXPORT_CATEGORIES
+from scraper.imports import IMPORT_CATEGORIES
+from scraper.rollups import trade_balance
+
+from .cache import LRUCache
+from .snapshot import SNAPSHOT_EXTENSION
+
+# Categories present in both the import and the export tables
+TRADE_BALANCE_CATEGORIES = [category for category in EXPORT_CATEGORIES if category in IMPORT_CATEGORIES]
+
+# Maximum number of years accepted in a single range
+MAX_YEARS = 60
+
+# Balances for ranges that include recent years expire after this many seconds
+RECENT_TTL = 3600.0
+
+FIRST_YEAR = 1970
+
+
+def parse_year_range(args) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Read the 'start' and 'end' query parameters.
+
+    Returns:
+        (start, end), with a missing bound equal to the other one, or
+        (None, None) for the latest year available.
+
+    Raises:
+        ValueError: If a bound is not a year or the range is invalid or too long.
+    """
+    bounds = []
+    for name in ("start", "end"):
+        value = args.get(name)
+        try:
+            bounds.append(int(value) if value else None)
+        except ValueError:
+            raise ValueError(f"Ano inválido para {name}: {value}")
+    start, end = bounds
+    if start is None and end is None:
+        return None, None
+    start = start if start is not None else end
+    end = end if end is not None else start
+
+    if start > end:
+        raise ValueError(f"Intervalo inválido: start ({start}) maior que end ({end})")
+    if start < FIRST_YEAR or end > date.today().year:
+        raise ValueError(f"Intervalo inválido: os anos devem estar entre {FIRST_YEAR} e {date.today().year}")
+    if end - start + 1 > MAX_YEARS:
+        raise ValueError(f"Um intervalo aceita no máximo {MAX_YEARS} anos, recebidos {end - start + 1}")
+    return start, end
+
+
+def resolve_latest(category: str, latest: Dict[Tuple[str, Optional[int]], Dict]) -> Tuple[int, List[Dict], Dict[Tuple[str, Optional[int]], Dict]]:
+    """
+    Choose the year to join from the latest import and export tables.
+
+    The latest year published in both datasets is used, and a dataset that lags
+    behind the other is listed as missing the newest year.
+
+    Args:
+        category: The category of the tables
+        latest: The latest tables, keyed by ("import", None) and ("export", None)
+
+    Returns:
+        (year, lagging, tables): the year, one {"dataset", "year", "returned_year"}
+        entry per lagging dataset, and the latest tables that are of that year,
+        keyed by (dataset, year); the others still have to be fetched.
+
+    Raises:
+        ValueError: If a table has no year.
+    """
+    years = {dataset: latest[(dataset, None)].get("year") for dataset in ("import", "export")}
+    if None in years.values():
+        raise ValueError(f"Ano mais recente não identificado nas tabelas de {category}")
+    year = min(years.values())
+    newest = max(years.values())
+    # A dataset that has not published the newest year yet is reported, and the join uses the common year
+    lagging = [{"dataset": dataset, "year": newest, "returned_year": returned} for dataset, returned in years.items() if returned != newest]
+    tables = {(dataset, year): table for (dataset, _), table in latest.items() if years[dataset] == year}
+    return year, lagging, tables
+
+
+def split_tables(tables: Dict[Tuple[str, Optional[int]], Dict], missing: List[Dict]) -> Tuple[Dict[int, Dict], Dict[int, Dict], List[Dict]]:
+    """
+    Split the tables by dataset and year, keeping only the years upstream returned.
+
+    Returns:
+        (imports, exports, missing): the tables by year, and missing extended with one
+        {"dataset", "year", "returned_year"} entry per table whose year upstream did not return.
+    """
+    imports: Dict[int, Dict] = {}
+    exports: Dict[int, Dict] = {}
+    for (dataset, year), table in sorted(tables.items()):
+        if table.get("year") != year:
+            missing.append({"dataset": dataset, "year": year, "returned_year": table.get("year")})
+            continue
+        (imports if dataset == "import" else exports)[year] = table
+    return imports, exports, missing
+
+
+def balance_result(category: str, start: int, end: int, imports: Dict[int, Dict], exports: Dict[int, Dict],
+                   missing: List[Dict]) -> Tuple[Dict, int]:
+    """
+    Join the tables into the response of /api/trade-balance.
+
+    Returns:
+        (result, status): 404 if no year of the range is available on both sides.
+    """
+    result = {"category": category, "start": start, "end": end, **trade_balance(imports, exports)}
+    if missing:
+        result["missing"] = missing
+        if not result["years"]:
+            return dict(result, error=f"Nenhum ano do intervalo disponível em importação e exportação de {category}"), 404
+    return result, 200
+
+
+def result_ttl(end: Optional[int], missing: List[Dict]) -> Optional[float]:
+    """Cache TTL of a result; end is the requested last year, None for the latest year."""
+    # Years missing upstream may still be published, so such results expire like recent ones
+    return None if is_historical_year(end) and not missing else RECENT_TTL
+
+
+def register_trade_balance_routes(app: Flask, max_workers: int = 8):
+    """Register trade balance routes."""
+
+    # Initialize the scraper
+    scraper = VitiBrasilScraper()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vitibrasil-balance")
+
+    # Balances by (category, start, end); fully historical ranges never expire
+    cache = LRUCache(max_entries=128, name="trade_balance")
+
+    def fetch_tables(category: str, lookups: List[Tuple[str, Optional[int]]]) -> Dict[Tuple[str, Optional[int]], Dict]:
+        """
+        Fetch the tables of the given (dataset, year) lookups, from the snapshot when possible.
+
+        Returns:
+            The tables keyed by the requested (dataset, year), whatever year upstream returned.
+        """
+        reader = current_app.extensions.get(SNAPSHOT_EXTENSION)
+        snapshot = reader.current() if reader is not None else None
+        getters = {"import": scraper.get_import_data, "export": scraper.get_export_data}
+
+        tables = {}
+        futures = {}
+        for dataset, year in lookups:
+            data = snapshot.get(dataset, category, year) if snapshot is not None else None
+            if data is not None:
+                tables[(dataset, year)] = data
+            else:
+                futures[(dataset, year)] = executor.submit(contextvars.copy_context().run, getters[dataset], category=category, year=year)
+        try:
+            for lookup, future in futures.items():
+                tables[lookup] = future.result()
+        finally:
+            # After a failure, lookups that have not started yet are dropped
+            for future in futures.values():
+                future.cancel()
+        return tables
+
+    def load_tables(category: str, start: Optional[int], end: Optional[int]) -> Tuple[int, int, Dict[int, Dict], Dict[int, Dict], List[Dict]]:
+        """
+        Fetch the import and export tables of the range, keeping only the years upstream returned on both sides.
+
+        Without a range, the latest year published in both datasets is used (see resolve_latest).
+
+        Returns:
+            (start, end, imports, exports, missing): the range joined, the tables by year, and one
+            {"dataset", "year", "returned_year"} entry per requested table whose year upstream did not return.
+        """
+        lagging: List[Dict] = []
+        if start is None:
+            latest = fetch_tables(category, [("import", None), ("export", None)])
+            start, lagging, tables = resolve_latest(category, latest)
+            end = start
+            missing_lookups = [(dataset, start) for dataset in ("import", "export") if (dataset, start) not in tables]
+            tables.update(fetch_tables(category, missing_lookups))
+        else:
+            tables = fetch_tables(category, [(dataset, year) for dataset in ("import", "export") for year in range(start, end + 1)])
+        return (start, end, *split_tables(tables, lagging))
+
+    @app.route('/api/trade-balance', methods=['GET'])
+    def get_trade_balance():
+        """
+        Get the trade balance of a category by country, joining imports and exports.
+
+        Query Parameters:
+            category: vinhos_mesa, espumantes, uvas_frescas or suco_uva
+            start (optional): First year of the range
+            end (optional): Last year of the range; without start and end, the latest year
+
+        Returns:
+            The imported and exported quantity and value of each country and the
+            balance (exported minus imported), for the whole range and per year.
+            Requested years that upstream did not return for a dataset are left
+            out of the join and listed in "missing"; 404 if no year is left.
+        """
+        category = request.args.get('category')
+        if category not in TRADE_BALANCE_CATEGORIES:
+            return jsonify({"error": f"Categoria inválida: {category}. Opções válidas são: {', '.join(TRADE_BALANCE_CATEGORIES)}"}), 400
+        try:
+            start, end = parse_year_range(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        key = (category, start, end)
+        result = cache.get(key)
+        if result is not None:
+            return jsonify(result)
+
+        try:
+            # Without a range, the response reports the year that was joined
+            first, last, imports, exports, missing = load_tables(category, start, end)
+            result, status = balance_result(category, first, last, imports, exports, missing)
+        except DeadlineExceeded as e:
+            return jsonify({"error": str(e)}), 504
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+        if status != 200:
+            return jsonify(result), status
+        cache.set(key, result, ttl=result_ttl(end, missing))
+        return jsonify(result)
@@ -5,8 +5,11 @@ Este módulo fornece a interface de linha de comando para o Scraper VitiBrasil.
 É usado tanto para execução direta quanto como ponto de entrada quando instalado como pacote.
 """
 
+from datetime import date
 import argparse
-from api import create_app 
+import logging
+import os
+import time
 
 
 def main():
@@ -21,6 +24,36 @@ def main():
     --host: O endereço IP onde a API será hospedada (padrão: 127.0.0.1)
     --port: A porta onde a API estará disponível (padrão: 5000)
     --debug: Ativa o modo de depuração do Flask
+    --server: Servidor usado: 'development' (padrão, servidor do Flask), 'production' (Gunicorn)
+              ou 'asgi' (variante assíncrona da API no Uvicorn)
+    --workers: Número de processos worker nos modos 'production' e 'asgi' (padrão: 2)
+    --threads: Número de threads por worker no modo 'production' (padrão: 4)
+    --graceful-timeout: Segundos para concluir requisições em andamento ao encerrar (padrão: 30)
+    --metrics: Habilita a coleta de métricas expostas em /metrics
+    --profile: Perfila todas as requisições ('all', padrão) ou apenas as com 'X-Profile: 1' ('header')
+    --profile-dir: Diretório onde os perfis são gravados (padrão: profiles)
+    --profile-mode: Perfilador usado: 'sampling' (padrão) ou 'cprofile'
+    --log-sample: Fração das mensagens de log emitidas a cada requisição que são mantidas (padrão: 1.0)
+    --log-json: Escreve o log como linhas JSON, com os campos opcao, subopcao, category, year, duration_ms e attempt
+    --hedge: Envia uma cópia das requisições ao site da Embrapa que demoram além do p90 recente
+    --rate-limit: Máximo de requisições por segundo ao site da Embrapa, incluindo as cópias
+    --archive: Diretório onde o HTML bruto de cada página buscada é arquivado, para o subcomando 'reparse'
+    --snapshot: Caminho de um snapshot publicado por 'vitibrasil snapshot', usado para servir os dados
+    --events-interval: Segundos entre as verificações de mudança avisadas em /api/events (padrão: 300)
+    --events-max-subscribers: Máximo de conexões abertas a /api/events por worker (padrão: metade de --threads
+                              no modo 'production', 1000 no modo 'asgi' e 16 no servidor de desenvolvimento)
+    --deadline: Prazo padrão de cada requisição em segundos; o cabeçalho X-Request-Timeout pode encurtá-lo
+    
+    Subcomando 'snapshot': busca todos os datasets e publica um snapshot compartilhado pelos workers
+    --output: Caminho do arquivo de snapshot (padrão: vitibrasil.snapshot)
+    --start / --end: Intervalo de anos incluídos (padrão: 1970 até o ano anterior ao corrente)
+    --interval: Republica o snapshot a cada N segundos, em vez de uma única vez
+    
+    Subcomando 'reparse': reexecuta os extratores atuais sobre um arquivo de HTML, sem rede
+    archive: Diretório do arquivo gravado com --archive
+    --output: Arquivo JSON Lines com os dados reprocessados (padrão: reparsed.jsonl)
+    --processes: Número de processos (padrão: número de CPUs)
+    --all-versions: Reprocessa todas as buscas de cada URL, e não só a mais recente
     
     Exemplos:
         # Execução direta
@@ -28,19 +61,172 @@ def main():
         
         # Execução após instalação como pacote
         vitibrasil --host 0.0.0.0 --port 8080 --debug
+        
+        # Servidor de produção com 4 processos de 8 threads
+        vitibrasil --server production --workers 4 --threads 8
+        
+        # Variante assíncrona da API
+        vitibrasil --server asgi --workers 2
+        
+        # Perfilamento apenas das requisições com o cabeçalho X-Profile: 1
+        vitibrasil --profile header --profile-dir /tmp/perfis
+        
+        # Publica o snapshot a cada hora e serve a API a partir dele
+        vitibrasil snapshot --output /var/lib/vitibrasil/dados.snapshot --interval 3600
+        vitibrasil --server production --snapshot /var/lib/vitibrasil/dados.snapshot
+        
+        # Arquiva o HTML buscado e, depois de mudar um extrator, reprocessa o arquivo
+        vitibrasil --archive /var/lib/vitibrasil/html snapshot
+        vitibrasil reparse /var/lib/vitibrasil/html --output dados.jsonl
     """
     parser = argparse.ArgumentParser(description="Executar a API VitiBrasil")
     parser.add_argument("--host", default="127.0.0.1", help="Host onde a API será executada")
     parser.add_argument("--port", type=int, default=5000, help="Porta onde a API será executada")
     parser.add_argument("--debug", action="store_true", help="Executar no modo de depuração")
+    parser.add_argument("--server", default="development", choices=["development", "production", "asgi"], help="Servidor usado para executar a API")
+    parser.add_argument("--workers", type=int, default=2, help="Número de processos worker nos modos 'production' e 'asgi'")
+    parser.add_argument("--threads", type=int, default=4, help="Número de threads por worker no modo 'production'")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="Segundos para concluir requisições em andamento ao encerrar")
+    parser.add_argument("--metrics", action="store_true", help="Habilitar a coleta de métricas em /metrics")
+    parser.add_argument("--profile", nargs="?", const="all", choices=["all", "header"], help="Perfilar todas as requisições ou apenas as com o cabeçalho X-Profile: 1")
+    parser.add_argument("--profile-dir", default="profiles", help="Diretório onde os perfis são gravados")
+    parser.add_argument("--profile-mode", default="sampling", choices=["sampling", "cprofile"], help="Perfilador usado")
+    parser.add_argument("--log-sample", type=float, default=1.0, help="Fração das mensagens de log por requisição mantidas (0 a 1)")
+    parser.add_argument("--log-json", action="store_true", help="Escrever o log como linhas JSON com campos estruturados")
+    parser.add_argument("--hedge", action="store_true", help="Enviar cópias de requisições lentas ao site da Embrapa")
+    parser.add_argument("--rate-limit", type=float, help="Máximo de requisições por segundo ao site da Embrapa")
+    parser.add_argument("--archive", help="Arquivar o HTML bruto das páginas buscadas neste diretório")
+    parser.add_argument("--snapshot", help="Servir os dados a partir deste snapshot, quando presentes nele")
+    parser.add_argument("--deadline", type=float, help="Prazo padrão de cada requisição à API, em segundos")
+    parser.add_argument("--events-interval", type=float, default=300, help="Segundos entre as verificações de mudança avisadas em /api/events")
+    parser.add_argument("--events-max-subscribers", type=int, help="Máximo de conexões abertas a /api/events por worker")
+    
+    subparsers = parser.add_subparsers(dest="command")
+    snapshot_parser = subparsers.add_parser("snapshot", help="Publicar um snapshot de todos os datasets")
+    snapshot_parser.add_argument("--output", default="vitibrasil.snapshot", help="Caminho do arquivo de snapshot")
+    snapshot_parser.add_argument("--start", type=int, default=1970, help="Primeiro ano incluído")
+    snapshot_parser.add_argument("--end", type=int, default=date.today().year - 1, help="Último ano incluído")
+    snapshot_parser.add_argument("--interval", type=int, help="Republicar o snapshot a cada N segundos")
+    reparse_parser = subparsers.add_parser("reparse", help="Reprocessar um arquivo de HTML bruto, sem acesso à rede")
+    reparse_parser.add_argument("archive", help="Diretório do arquivo de HTML")
+    reparse_parser.add_argument("--output", default="reparsed.jsonl", help="Arquivo JSON Lines de saída")
+    reparse_parser.add_argument("--processes", type=int, help="Número de processos")
+    reparse_parser.add_argument("--all-versions", action="store_true", help="Reprocessar todas as buscas de cada URL")
     
     args = parser.parse_args()
     
-    app = create_app()
+    from scraper.logs import configure_logging
+    configure_logging(level=logging.INFO, sample_rate=args.log_sample, json_lines=args.log_json)
+    
+    if args.hedge or args.rate_limit:
+        from scraper import hedging
+        if args.hedge:
+            hedging.enable()
+        if args.rate_limit:
+            hedging.set_rate_limit(args.rate_limit)
+    
+    if args.archive:
+        from scraper import archive
+        archive.enable(args.archive)
+    
+    if args.command == "snapshot":
+        run_snapshot_refresher(args)
+        return
+    if args.command == "reparse":
+        run_reparse(args)
+        return
+    
+    # Os módulos da API são importados só depois da análise dos argumentos,
+    # para que '--help' e erros de uso respondam sem carregar Flask e scraper
+    from api import create_app
+    from scraper import metrics
+    
+    if args.metrics:
+        metrics.enable()
+    
+    config = {
+        "VITIBRASIL_PROFILE": args.profile,
+        "VITIBRASIL_PROFILE_DIR": args.profile_dir,
+        "VITIBRASIL_PROFILE_MODE": args.profile_mode,
+        "VITIBRASIL_SNAPSHOT": args.snapshot,
+        "VITIBRASIL_EVENTS_INTERVAL": args.events_interval,
+        "VITIBRASIL_DEADLINE": args.deadline,
+        "VITIBRASIL_EVENTS_MAX_SUBSCRIBERS": args.events_max_subscribers,
+    }
+    
     print(f"* Iniciando API VitiBrasil em http://{args.host}:{args.port}")
+    if args.server == "production":
+        from api.server import run_production_server
+        print(f"* Servidor de produção: {args.workers} workers x {args.threads} threads")
+        if args.events_max_subscribers is None:
+            # Cada stream de /api/events ocupa uma thread; metade delas fica para as demais rotas
+            config["VITIBRASIL_EVENTS_MAX_SUBSCRIBERS"] = max(1, args.threads // 2)
+        run_production_server(
+            lambda: create_app(config),
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            threads=args.threads,
+            graceful_timeout=args.graceful_timeout,
+        )
+        return
+    if args.server == "asgi":
+        import uvicorn
+        # Os workers do uvicorn criam a aplicação pela factory, que lê a configuração do ambiente
+        for name, value in (
+            ("VITIBRASIL_DEADLINE", args.deadline),
+            ("VITIBRASIL_SNAPSHOT", args.snapshot),
+            ("VITIBRASIL_EVENTS_INTERVAL", args.events_interval),
+            ("VITIBRASIL_EVENTS_MAX_SUBSCRIBERS", args.events_max_subscribers),
+            ("VITIBRASIL_HEDGE", "1" if args.hedge else None),
+            ("VITIBRASIL_RATE_LIMIT", args.rate_limit),
+            ("VITIBRASIL_ARCHIVE", args.archive),
+            ("VITIBRASIL_LOG_SAMPLE", args.log_sample if args.log_sample != 1.0 else None),
+            ("VITIBRASIL_LOG_JSON", "1" if args.log_json else None),
+            ("VITIBRASIL_METRICS", "1" if args.metrics else None),
+        ):
+            if value is not None:
+                os.environ[name] = str(value)
+        print(f"* Servidor ASGI: {args.workers} workers")
+        uvicorn.run(
+            "api.asgi:create_asgi_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_graceful_shutdown=args.graceful_timeout,
+        )
+        return
+    
+    app = create_app(config)
     print(f"* Modo de depuração: {'Ativado' if args.debug else 'Desativado'}")
     app.run(host=args.host, port=args.port, debug=args.debug)
 
 
+
+def run_snapshot_refresher(args):
+    """Publica o snapshot uma vez ou, com --interval, periodicamente."""
+    from scraper.snapshot import build_snapshot
+    
+    years = range(args.start, args.end + 1)
+    while True:
+        stats = build_snapshot(args.output, years)
+        print(f"* Snapshot publicado em {args.output}: {stats['entries']} payloads "
+              f"({stats['reused']} reaproveitados, {stats['errors']} com erro)")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+def run_reparse(args):
+    """Reprocessa um arquivo de HTML bruto com os extratores atuais."""
+    from scraper.archive import reparse
+    
+    started = time.perf_counter()
+    stats = reparse(args.archive, args.output, processes=args.processes, all_versions=args.all_versions)
+    print(f"* {stats['pages']} páginas reprocessadas em {time.perf_counter() - started:.1f}s "
+          f"({stats['errors']} com erro), gravadas em {args.output}")
+
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
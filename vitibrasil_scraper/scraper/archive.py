@@ -0,0 +1,192 @@
+"""
+Arquivo do HTML bruto buscado no site da Embrapa, para reprocessamento offline.
+
+Com o arquivo ativo, cada página buscada com sucesso é gravada comprimida
+(gzip) em um armazenamento endereçado por conteúdo: o nome de cada objeto é o
+SHA-256 dos bytes da página, de modo que páginas idênticas buscadas várias
+vezes ocupam espaço uma única vez. Um índice em JSON Lines registra a URL, o
+instante da busca e o objeto de cada busca.
+
+Estrutura do diretório:
+    index.jsonl              uma linha {"url", "fetched_at", "sha256", "size"} por busca
+    objects/ab/abcdef...gz   conteúdo comprimido de cada página
+
+O arquivo é ativado pela variável de ambiente VITIBRASIL_ARCHIVE (o diretório)
+ou por enable(). reparse() reexecuta os extratores atuais sobre o arquivo em
+vários processos, sem acesso à rede.
+"""
+
+from multiprocessing import Pool
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HtmlArchive:
+    """Armazenamento comprimido e endereçado por conteúdo das páginas buscadas."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Diretório do arquivo; é criado se não existir
+        """
+        self.root = root
+        self.index_path = os.path.join(root, "index.jsonl")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.gz")
+
+    def store(self, url: str, content: bytes, fetched_at: Optional[float] = None) -> str:
+        """
+        Grava uma página buscada.
+
+        Args:
+            url: A URL buscada
+            content: Os bytes da resposta
+            fetched_at: O instante da busca (epoch); o atual se None
+
+        Returns:
+            O SHA-256 do conteúdo.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".object-")
+            try:
+                # GzipFile em vez de gzip.compress, que só aceita mtime a partir do Python 3.8
+                with os.fdopen(fd, "wb") as f, gzip.GzipFile(fileobj=f, mode="wb", compresslevel=9, mtime=0) as gz:
+                    gz.write(content)
+                os.replace(temp_path, path)
+            except BaseException:
+                # Não deixa objetos parciais para trás se a gravação falhar
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+
+        record = {"url": url, "fetched_at": fetched_at if fetched_at is not None else time.time(), "sha256": digest, "size": len(content)}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(line)
+        return digest
+
+    def load(self, digest: str) -> bytes:
+        """Retorna os bytes originais de um objeto."""
+        with open(self._object_path(digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def entries(self) -> Iterator[Dict]:
+        """Itera sobre as buscas registradas, na ordem em que foram feitas."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def latest_entries(self) -> List[Dict]:
+        """Retorna a busca mais recente de cada URL."""
+        latest: Dict[str, Dict] = {}
+        for entry in self.entries():
+            if entry["url"] not in latest or entry["fetched_at"] >= latest[entry["url"]]["fetched_at"]:
+                latest[entry["url"]] = entry
+        return list(latest.values())
+
+
+ARCHIVE: Optional[HtmlArchive] = HtmlArchive(os.environ["VITIBRASIL_ARCHIVE"]) if os.environ.get("VITIBRASIL_ARCHIVE") else None
+
+
+def enable(root: str) -> None:
+    """Passa a arquivar as páginas buscadas por todos os scrapers do processo."""
+    global ARCHIVE
+    ARCHIVE = HtmlArchive(root)
+
+
+def disable() -> None:
+    """Deixa de arquivar as páginas buscadas."""
+    global ARCHIVE
+    ARCHIVE = None
+
+
+# Scraper e arquivo de cada processo do reprocessamento
+_worker_scraper = None
+_worker_archive: Optional[HtmlArchive] = None
+
+
+def _reparse_entry(task) -> Dict:
+    """Reexecuta o extrator de uma página arquivada; roda nos processos do pool."""
+    global _worker_scraper, _worker_archive
+    root, entry = task
+    from bs4 import BeautifulSoup
+
+    from . import VitiBrasilScraper
+    from .base import DATASETS_BY_OPCAO, url_options
+    from .datasets import DATASETS
+    if _worker_scraper is None:
+        _worker_scraper = VitiBrasilScraper()
+    if _worker_archive is None or _worker_archive.root != root:
+        _worker_archive = HtmlArchive(root)
+
+    result = {"url": entry["url"], "fetched_at": entry["fetched_at"], "sha256": entry["sha256"]}
+    opcao, subopcao = url_options(entry["url"])
+    dataset = DATASETS.get(DATASETS_BY_OPCAO.get(opcao, ""))
+    if dataset is None:
+        return dict(result, error=f"Opção desconhecida na URL: {opcao}")
+    result["dataset"] = dataset.name
+
+    args = []
+    if dataset.categories is not None:
+        categories = {value: key for key, value in dataset.categories.items()}
+        if subopcao not in categories:
+            return dict(result, error=f"Subopção desconhecida na URL: {subopcao}")
+        result["category"] = categories[subopcao]
+        args.append(categories[subopcao])
+
+    try:
+        soup = BeautifulSoup(_worker_archive.load(entry["sha256"]), "html.parser")
+        data = getattr(_worker_scraper, dataset.parser)(soup, *args)
+    except Exception as e:
+        return dict(result, error=str(e))
+    result["year"] = data.get("year")
+    result["data"] = data
+    return result
+
+
+def reparse(root: str, output: str, processes: Optional[int] = None, all_versions: bool = False) -> Dict:
+    """
+    Reexecuta os extratores atuais sobre as páginas arquivadas, em paralelo e sem rede.
+
+    Args:
+        root: Diretório do arquivo
+        output: Arquivo JSON Lines de saída, com uma linha por página reprocessada
+        processes: Número de processos; o número de CPUs se None
+        all_versions: Reprocessa todas as buscas de cada URL, e não só a mais recente
+
+    Returns:
+        Dict com o número de páginas reprocessadas e com erro.
+    """
+    archive = HtmlArchive(root)
+    entries = list(archive.entries()) if all_versions else archive.latest_entries()
+    stats = {"pages": 0, "errors": 0}
+
+    with Pool(processes=processes) as pool, open(output, "w", encoding="utf-8") as f:
+        tasks = ((root, entry) for entry in entries)
+        for result in pool.imap_unordered(_reparse_entry, tasks, chunksize=16):
+            stats["pages"] += 1
+            if "error" in result:
+                stats["errors"] += 1
+                logger.error("Erro ao reprocessar %s: %s", result["url"], result["error"])
+            f.write(json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    logger.info("Reprocessamento de %s concluído: %s", root, stats)
+    return stats
@@ -0,0 +1,180 @@
+"""
+Variante assíncrona do scraper, para servidores ASGI.
+
+As requisições ao site da Embrapa usam E/S não bloqueante (httpx), de modo que
+um único processo pode manter milhares de buscas lentas em andamento. A
+montagem das URLs e a extração das tabelas reutilizam os métodos do
+`VitiBrasilScraper`; a análise do HTML, que consome CPU, roda em um pool de
+threads para não bloquear o event loop.
+"""
+
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+import asyncio
+import logging
+import time
+
+import httpx
+from bs4 import BeautifulSoup
+
+from . import VitiBrasilScraper, archive, deadline, hedging, metrics
+from .base import DATASETS_BY_OPCAO, url_options
+from .logs import sampled
+from .exports import EXPORT_CATEGORIES
+from .imports import IMPORT_CATEGORIES
+from .processing import PROCESSING_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVitiBrasilScraper:
+    """Scraper assíncrono com os mesmos métodos get_* do VitiBrasilScraper."""
+
+    def __init__(self, max_retries: int = 3, timeout: int = 10, max_connections: int = 100):
+        """
+        Inicializa o scraper.
+
+        Args:
+            max_retries: Número máximo de tentativas para requisições HTTP
+            timeout: Tempo limite para requisições HTTP em segundos
+            max_connections: Número máximo de conexões simultâneas com o site
+        """
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._scraper = VitiBrasilScraper(max_retries=max_retries, timeout=timeout)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def aclose(self) -> None:
+        """Fecha as conexões abertas."""
+        await self.client.aclose()
+
+    async def _fetch_page(self, url: str, parser: Callable[..., Dict], *args) -> Dict:
+        """
+        Busca uma página com lógica de retry e extrai seus dados.
+
+        Args:
+            url: A URL para buscar
+            parser: Método de extração do VitiBrasilScraper que recebe a página analisada
+            *args: Argumentos adicionais do método de extração
+
+        Returns:
+            Os dados extraídos da página
+
+        Raises:
+            DeadlineExceeded: Se o prazo da requisição (scraper.deadline) se esgotar
+            Exception: Se a página não puder ser buscada após as tentativas
+        """
+        opcao, subopcao = url_options(url)
+        dataset = DATASETS_BY_OPCAO.get(opcao, opcao)
+
+        for attempt in range(self.max_retries):
+            # Cada tentativa dispõe no máximo do tempo restante do prazo
+            timeout = deadline.attempt_timeout(self.timeout)
+            limiter = hedging.RATE_LIMITER
+            if limiter is not None and not await limiter.acquire_async(timeout=deadline.remaining()):
+                raise deadline.DeadlineExceeded("Prazo da requisição esgotado aguardando o limite de taxa")
+            started = time.perf_counter()
+            try:
+                response = await self.client.get(url, timeout=timeout)
+                response.raise_for_status()
+                elapsed = self._scraper._record_fetch(dataset, opcao, subopcao, "ok", started)
+                logger.info(
+                    "Página buscada de %s", url,
+                    extra=sampled(opcao=opcao, subopcao=subopcao, duration_ms=round(elapsed * 1000, 1), attempt=attempt + 1),
+                )
+                if archive.ARCHIVE is not None:
+                    # Compressão e gravação no arquivo fora do event loop
+                    await asyncio.get_running_loop().run_in_executor(None, self._scraper._archive, url, response.content)
+                break
+            except httpx.HTTPError as e:
+                elapsed = self._scraper._record_fetch(dataset, opcao, subopcao, "error", started)
+                logger.error(
+                    "Erro de requisição na tentativa %d/%d: %s", attempt + 1, self.max_retries, e,
+                    extra={"opcao": opcao, "subopcao": subopcao, "duration_ms": round(elapsed * 1000, 1), "attempt": attempt + 1},
+                )
+                if attempt + 1 < self.max_retries:
+                    wait_time = 2 ** attempt  # Backoff exponencial
+                    if not deadline.can_wait(wait_time):
+                        raise deadline.DeadlineExceeded(f"Prazo da requisição esgotado após {attempt + 1} tentativas") from e
+                    metrics.FETCH_RETRIES.inc(opcao=opcao, subopcao=subopcao)
+                    logger.info("Tentando novamente em %d segundos...", wait_time, extra={"opcao": opcao, "subopcao": subopcao})
+                    await asyncio.sleep(wait_time)
+                elif deadline.expired():
+                    raise deadline.DeadlineExceeded(f"Prazo da requisição esgotado após {attempt + 1} tentativas") from e
+                else:
+                    raise Exception(f"Falha ao buscar dados após {self.max_retries} tentativas") from e
+
+        def parse() -> Dict:
+            started = time.perf_counter()
+            soup = BeautifulSoup(response.content, "html.parser")
+            self._scraper._record_stage(dataset, "html", started)
+            return parser(soup, *args)
+
+        return await asyncio.get_running_loop().run_in_executor(None, parse)
+
+    async def _get_all(self, getter: Callable[..., Awaitable[Dict]], categories: Iterable[str], label: str, year: Optional[int]) -> Dict:
+        """Busca todas as categorias em paralelo, no mesmo formato dos métodos get_all_* síncronos."""
+        categories = list(categories)
+        responses = await asyncio.gather(
+            *(getter(category=category, year=year) for category in categories),
+            return_exceptions=True,
+        )
+
+        result = {
+            "year": year,
+            "categories": {}
+        }
+        for category, data in zip(categories, responses):
+            if isinstance(data, deadline.DeadlineExceeded):
+                logger.warning("Categoria '%s' de %s não buscada: %s", category, label, data, extra={"category": category, "year": year})
+                result["categories"][category] = {"error": str(data)}
+                result["partial"] = True
+                continue
+            if isinstance(data, Exception):
+                logger.error("Erro ao buscar dados de %s para categoria '%s': %s", label, category, data, extra={"category": category, "year": year})
+                result["categories"][category] = {"error": str(data)}
+                continue
+            result["categories"][category] = data
+            # Atualiza o ano no resultado principal com base na primeira resposta bem-sucedida
+            if result["year"] is None:
+                result["year"] = data["year"]
+        return result
+
+    async def get_production_data(self, year: Optional[int] = None) -> Dict:
+        """Obtém dados de produção de vinho para um ano específico."""
+        url = self._scraper._production_url(year)
+        return await self._fetch_page(url, self._scraper._parse_production_page)
+
+    async def get_processing_data(self, category: str = "viniferas", year: Optional[int] = None) -> Dict:
+        """Obtém dados de processamento de uvas para uma categoria e ano específicos."""
+        url = self._scraper._processing_url(category, year)
+        return await self._fetch_page(url, self._scraper._parse_processing_page, category)
+
+    async def get_all_processing_data(self, year: Optional[int] = None) -> Dict:
+        """Obtém dados de processamento de uvas para todas as categorias em um ano específico."""
+        return await self._get_all(self.get_processing_data, PROCESSING_CATEGORIES, "processamento", year)
+
+    async def get_commercialization_data(self, year: Optional[int] = None) -> Dict:
+        """Obtém dados de comercialização para vinhos e derivados para um ano específico."""
+        url = self._scraper._commercialization_url(year)
+        return await self._fetch_page(url, self._scraper._parse_commercialization_page)
+
+    async def get_import_data(self, category: str = "vinhos_mesa", year: Optional[int] = None) -> Dict:
+        """Obtém dados de importação para uma categoria e ano específicos."""
+        url = self._scraper._import_url(category, year)
+        return await self._fetch_page(url, self._scraper._parse_import_page, category)
+
+    async def get_all_import_data(self, year: Optional[int] = None) -> Dict:
+        """Obtém dados de importação para todas as categorias em um ano específico."""
+        return await self._get_all(self.get_import_data, IMPORT_CATEGORIES, "importação", year)
+
+    async def get_export_data(self, category: str = "vinhos_mesa", year: Optional[int] = None) -> Dict:
+        """Obtém dados de exportação para uma categoria e ano específicos."""
+        url = self._scraper._export_url(category, year)
+        return await self._fetch_page(url, self._scraper._parse_export_page, category)
+
+    async def get_all_export_data(self, year: Optional[int] = None) -> Dict:
+        """Obtém dados de exportação para todas as categorias em um ano específico."""
+        return await self._get_all(self.get_export_data, EXPORT_CATEGORIES, "exportação", year)
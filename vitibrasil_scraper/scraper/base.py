@@ -2,21 +2,52 @@
 Módulo base do scraper com funcionalidades comuns.
 """
 
-import requests
-from bs4 import BeautifulSoup
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
 import logging
+import os
 import time
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from . import archive, deadline, hedging, metrics, profiling
+from .logs import sampled
+
+# requests e BeautifulSoup são importados apenas na primeira busca, para que
+# importar o scraper seja rápido
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
 logger = logging.getLogger(__name__)
 
+# Mapeia o parâmetro 'opcao' das URLs para o nome do dataset
+DATASETS_BY_OPCAO = {
+    "opt_02": "production",
+    "opt_03": "processing",
+    "opt_04": "commercialization",
+    "opt_05": "import",
+    "opt_06": "export",
+}
+
+
+def url_options(url: str) -> Tuple[str, str]:
+    """
+    Extrai os parâmetros 'opcao' e 'subopcao' de uma URL do site.
+
+    Args:
+        url: A URL da página
+
+    Returns:
+        Tupla (opcao, subopcao), com strings vazias para parâmetros ausentes.
+    """
+    query = parse_qs(urlsplit(url).query)
+    return query.get("opcao", [""])[0], query.get("subopcao", [""])[0]
+
 
 class BaseScraper:
     """Scraper base com funcionalidades comuns."""
 
-    BASE_URL = "http://vitibrasil.cnpuv.embrapa.br"
+    # Pode ser sobrescrita para apontar para um espelho ou servidor local de testes
+    BASE_URL = os.environ.get("VITIBRASIL_BASE_URL", "http://vitibrasil.cnpuv.embrapa.br")
 
     def __init__(self, max_retries: int = 3, timeout: int = 10):
         """
@@ -26,11 +57,19 @@ class BaseScraper:
             max_retries: Número máximo de tentativas para requisições HTTP
             timeout: Tempo limite para requisições HTTP em segundos
         """
-        self.session = requests.Session()
+        self._session: Optional["requests.Session"] = None
         self.max_retries = max_retries
         self.timeout = timeout
     
-    def _fetch_page(self, url: str) -> BeautifulSoup:
+    @property
+    def session(self) -> "requests.Session":
+        """Sessão HTTP, criada no primeiro uso."""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+    
+    def _fetch_page(self, url: str) -> "BeautifulSoup":
         """
         Busca uma página com lógica de retry.
         
@@ -41,26 +80,102 @@ class BaseScraper:
             Objeto BeautifulSoup da página analisada
             
         Raises:
+            DeadlineExceeded: Se o prazo da requisição (scraper.deadline) se esgotar
             Exception: Se a página não puder ser buscada após as tentativas
         """
-        logger.info(f"Buscando página de {url}")
+        import requests
+        from bs4 import BeautifulSoup
+        
+        opcao, subopcao = url_options(url)
+        dataset = DATASETS_BY_OPCAO.get(opcao, opcao)
         
         # Tenta obter os dados com retries
         for attempt in range(self.max_retries):
+            # Cada tentativa dispõe no máximo do tempo restante do prazo
+            timeout = deadline.attempt_timeout(self.timeout)
+            started = time.perf_counter()
             try:
-                response = self.session.get(url, timeout=self.timeout)
+                response = self._get(url, opcao, timeout)
                 response.raise_for_status()
+                elapsed = self._record_fetch(dataset, opcao, subopcao, "ok", started)
+                logger.info(
+                    "Página buscada de %s", url,
+                    extra=sampled(opcao=opcao, subopcao=subopcao, duration_ms=round(elapsed * 1000, 1), attempt=attempt + 1),
+                )
+                self._archive(url, response.content)
                 break
             except requests.RequestException as e:
-                logger.error(f"Erro de requisição na tentativa {attempt + 1}/{self.max_retries}: {e}")
+                elapsed = self._record_fetch(dataset, opcao, subopcao, "error", started)
+                logger.error(
+                    "Erro de requisição na tentativa %d/%d: %s", attempt + 1, self.max_retries, e,
+                    extra={"opcao": opcao, "subopcao": subopcao, "duration_ms": round(elapsed * 1000, 1), "attempt": attempt + 1},
+                )
                 if attempt + 1 < self.max_retries:
                     wait_time = 2 ** attempt  # Backoff exponencial
-                    logger.info(f"Tentando novamente em {wait_time} segundos...")
+                    if not deadline.can_wait(wait_time):
+                        raise deadline.DeadlineExceeded(f"Prazo da requisição esgotado após {attempt + 1} tentativas") from e
+                    metrics.FETCH_RETRIES.inc(opcao=opcao, subopcao=subopcao)
+                    logger.info("Tentando novamente em %d segundos...", wait_time, extra={"opcao": opcao, "subopcao": subopcao})
                     time.sleep(wait_time)
+                elif deadline.expired():
+                    raise deadline.DeadlineExceeded(f"Prazo da requisição esgotado após {attempt + 1} tentativas") from e
                 else:
                     raise Exception(f"Falha ao buscar dados após {self.max_retries} tentativas") from e
         
-        return BeautifulSoup(response.content, "html.parser")
+        started = time.perf_counter()
+        soup = BeautifulSoup(response.content, "html.parser")
+        self._record_stage(dataset, "html", started)
+        return soup
+    
+    def _get(self, url: str, opcao: str, timeout: Optional[float] = None) -> "requests.Response":
+        """
+        Faz uma requisição respeitando o limite de taxa e, se ativo, com hedging.
+        
+        Args:
+            url: A URL para buscar
+            opcao: A opcao da URL, que agrupa as latências usadas no limiar de hedging
+            timeout: Tempo limite da requisição em segundos; self.timeout se None
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        limiter = hedging.RATE_LIMITER
+        if limiter is not None and not limiter.acquire(timeout=deadline.remaining()):
+            raise deadline.DeadlineExceeded("Prazo da requisição esgotado aguardando o limite de taxa")
+        
+        session = self.session
+        hedger = hedging.HEDGER
+        if hedger is None:
+            return session.get(url, timeout=timeout)
+        return hedger.call(lambda: session.get(url, timeout=timeout), opcao, limiter, timeout=deadline.remaining())
+    
+    def _archive(self, url: str, content: bytes) -> None:
+        """Grava a página buscada no arquivo de HTML bruto, se ativo; falhas apenas são registradas no log."""
+        html_archive = archive.ARCHIVE
+        if html_archive is None:
+            return
+        try:
+            html_archive.store(url, content)
+        except OSError as e:
+            logger.error("Erro ao arquivar página de %s: %s", url, e)
+    
+    def _record_fetch(self, dataset: str, opcao: str, subopcao: str, outcome: str, started: float) -> float:
+        """Registra a duração de uma tentativa de requisição nas métricas e no perfil ativo, e a retorna."""
+        elapsed = time.perf_counter() - started
+        metrics.FETCH_SECONDS.observe(elapsed, opcao=opcao, subopcao=subopcao, outcome=outcome)
+        profiling.record(f"fetch:{dataset}", elapsed)
+        return elapsed
+    
+    def _record_stage(self, dataset: str, stage: str, started: float) -> None:
+        """
+        Registra a duração de uma etapa de análise nas métricas e no perfil ativo.
+        
+        Args:
+            dataset: O nome do dataset (ex.: 'export')
+            stage: A etapa ('html' para o BeautifulSoup, 'extract' para a extração das tabelas)
+            started: O instante de início da etapa, obtido de time.perf_counter()
+        """
+        elapsed = time.perf_counter() - started
+        metrics.PARSE_SECONDS.observe(elapsed, dataset=dataset, stage=stage)
+        profiling.record(f"{stage}:{dataset}", elapsed)
     
     def _parse_number(self, text: str) -> Optional[int]:
         """
@@ -84,5 +199,5 @@ class BaseScraper:
         try:
             return int(cleaned_text)
         except ValueError:
-            logger.warning(f"Não foi possível analisar número do texto: '{text}'")
+            logger.warning("Não foi possível analisar número do texto: '%s'", text)
             return None 
\ No newline at end of file
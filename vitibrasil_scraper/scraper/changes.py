@@ -0,0 +1,317 @@
+"""
+Detecção de mudanças nas tabelas e distribuição de avisos aos assinantes.
+
+ChangeDetector guarda um hash do conteúdo de cada tabela (dataset, categoria,
+ano) e, a cada atualização, informa quais tabelas mudaram. ChangeBroker
+distribui os avisos às conexões abertas (ex.: o stream de /api/events) e guarda
+os mais recentes, para que um cliente reconectado receba os que perdeu. Uma
+conexão é uma Subscription, lida por uma thread, ou uma AsyncSubscription,
+lida por um event loop.
+
+ChangeWatcher é a thread que faz as atualizações: lê as tabelas do snapshot
+compartilhado, quando configurado (apenas quando um novo snapshot é
+publicado), ou as busca no site da Embrapa a cada intervalo. A primeira leitura
+apenas registra os hashes, sem gerar avisos.
+
+Formato de um aviso:
+    {"id": "3c9d2f81a04b-7", "dataset": "export", "category": "espumantes", "year": 2024, "hash": "3f2a9c0d5e1b7a84", "detected_at": 1700000000.0}
+"""
+
+from collections import deque
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import asyncio
+import hashlib
+import logging
+import os
+import queue
+import time
+import uuid
+
+from . import metrics
+from .datasets import DATASETS
+from .snapshot import Snapshot, dump_payload
+
+logger = logging.getLogger(__name__)
+
+# Tabela lida em uma atualização: dataset, categoria, ano e o conteúdo serializado
+Table = Tuple[str, Optional[str], Optional[int], Union[bytes, memoryview]]
+
+
+def content_hash(payload: Union[bytes, memoryview]) -> str:
+    """Hash curto do conteúdo serializado de uma tabela."""
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class ChangeDetector:
+    """Compara o hash de cada tabela com o da atualização anterior."""
+
+    def __init__(self):
+        self._hashes: Dict[Tuple[str, Optional[str], Optional[int]], str] = {}
+
+    def update(self, tables: Iterable[Table]) -> List[Dict]:
+        """
+        Registra o conteúdo atual das tabelas.
+
+        Returns:
+            Uma mudança {"dataset", "category", "year", "hash"} por tabela nova ou
+            alterada; vazia na primeira atualização, que apenas registra os hashes.
+        """
+        baseline = not self._hashes
+        changes = []
+        for dataset, category, year, payload in tables:
+            key = (dataset, category, year)
+            digest = content_hash(payload)
+            if self._hashes.get(key) == digest:
+                continue
+            self._hashes[key] = digest
+            if not baseline:
+                changes.append({"dataset": dataset, "category": category, "year": year, "hash": digest})
+        return changes
+
+
+class TooManySubscribers(RuntimeError):
+    """Levantada quando o limite de conexões abertas ao stream de avisos foi atingido."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Limite de {limit} conexões abertas ao stream de avisos atingido; tente novamente mais tarde")
+
+
+class Subscription:
+    """Fila de avisos de uma conexão."""
+
+    def __init__(self, max_pending: int):
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=max_pending)
+        # Avisos perdidos desde o último id informado pelo cliente; None se não for possível recuperá-los
+        self.missed: Optional[List[Dict]] = []
+        # Marcada quando a fila enche: a conexão deve ser encerrada para o cliente reconectar
+        self.closed = False
+
+    def _deliver(self, event: Dict) -> bool:
+        """Enfileira um aviso; retorna False se a fila estiver cheia."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Retorna o próximo aviso, ou None se nenhum chegar em timeout segundos."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """Fila de avisos de uma conexão atendida por um event loop (ex.: a variante ASGI da API)."""
+
+    def __init__(self, max_pending: int, loop: asyncio.AbstractEventLoop):
+        super().__init__(max_pending)
+        self.max_pending = max_pending
+        self._loop = loop
+        self._async_queue: "asyncio.Queue[Dict]" = asyncio.Queue()
+        # Avisos entregues ao loop e ainda não lidos; a fila do loop só é acessada pela thread dele
+        self._pending = 0
+        self._pending_lock = Lock()
+
+    def _deliver(self, event: Dict) -> bool:
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+        try:
+            self._loop.call_soon_threadsafe(self._async_queue.put_nowait, event)
+        except RuntimeError:
+            # Loop já encerrado
+            return False
+        return True
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        """Retorna o próximo aviso, ou None se nenhum chegar em timeout segundos."""
+        try:
+            event = await asyncio.wait_for(self._async_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        with self._pending_lock:
+            self._pending -= 1
+        return event
+
+
+class ChangeBroker:
+    """Distribui os avisos de mudança às assinaturas abertas."""
+
+    def __init__(self, history: int = 256, max_pending: int = 100, max_subscribers: Optional[int] = None):
+        """
+        Args:
+            history: Quantos avisos recentes são guardados para clientes reconectados
+            max_pending: Avisos pendentes por conexão antes de ela ser encerrada
+            max_subscribers: Máximo de conexões abertas ao mesmo tempo; None para não limitar
+        """
+        self.max_pending = max_pending
+        self.max_subscribers = max_subscribers
+        self._history: "deque[Tuple[int, Dict]]" = deque(maxlen=history)
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = Lock()
+        self._pid: Optional[int] = None
+        self._check_process()
+
+    def _check_process(self) -> None:
+        """
+        Inicia a numeração dos avisos no processo atual.
+
+        Os ids têm a forma '<época>-<sequência>', com uma época sorteada por processo:
+        um cliente que reconecta em outro processo (ex.: outro worker do Gunicorn), ou
+        após um reinício, envia um Last-Event-ID de outra época e recebe um 'reset'. Um
+        broker criado antes do fork recomeça do zero em cada worker.
+        """
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self.epoch = uuid.uuid4().hex[:12]
+        self._next_seq = 1
+        self._history.clear()
+        self._subscriptions.clear()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, last_event_id: Optional[str] = None, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        """
+        Abre uma assinatura.
+
+        Args:
+            last_event_id: O último aviso recebido pelo cliente (cabeçalho Last-Event-ID);
+                os avisos posteriores ainda guardados ficam em subscription.missed
+            loop: O event loop que lê os avisos; se informado, retorna uma AsyncSubscription
+
+        Raises:
+            TooManySubscribers: Se já houver max_subscribers conexões abertas
+        """
+        if loop is not None:
+            subscription = AsyncSubscription(self.max_pending, loop)
+        else:
+            subscription = Subscription(self.max_pending)
+        with self._lock:
+            self._check_process()
+            if self.max_subscribers is not None and len(self._subscriptions) >= self.max_subscribers:
+                raise TooManySubscribers(self.max_subscribers)
+            if last_event_id is not None:
+                epoch, _, seq = last_event_id.partition("-")
+                oldest = self._history[0][0] if self._history else self._next_seq
+                if epoch == self.epoch and seq.isdigit() and oldest - 1 <= int(seq) < self._next_seq:
+                    subscription.missed = [event for event_seq, event in self._history if event_seq > int(seq)]
+                else:
+                    # Avisos já descartados do histórico, de outro processo ou de antes de um reinício
+                    subscription.missed = None
+            self._subscriptions.add(subscription)
+            metrics.EVENT_SUBSCRIBERS.set(len(self._subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Fecha uma assinatura."""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            metrics.EVENT_SUBSCRIBERS.set(len(self._subscriptions))
+
+    def publish(self, change: Dict) -> Dict:
+        """Numera um aviso e o entrega a todas as assinaturas; retorna o aviso numerado."""
+        with self._lock:
+            self._check_process()
+            seq = self._next_seq
+            self._next_seq += 1
+            event = dict(change, id=f"{self.epoch}-{seq}")
+            self._history.append((seq, event))
+            for subscription in list(self._subscriptions):
+                if not subscription._deliver(event):
+                    # Cliente lento: a conexão é encerrada e ele recupera os avisos ao reconectar
+                    subscription.closed = True
+                    self._subscriptions.discard(subscription)
+            metrics.EVENT_SUBSCRIBERS.set(len(self._subscriptions))
+        return event
+
+
+def snapshot_tables(snapshot: Snapshot) -> Iterator[Table]:
+    """Itera sobre as tabelas de um snapshot, sem os agregados."""
+    for key in snapshot.keys():
+        dataset, category, _ = key.split("/")
+        if dataset not in DATASETS:
+            continue
+        yield dataset, None if category == "-" else category, snapshot.year(key), snapshot.raw(key)
+
+
+def scraped_tables(scraper) -> Iterator[Table]:
+    """Busca o último ano disponível de cada tabela no site da Embrapa."""
+    for dataset in DATASETS.values():
+        for category in dataset.categories or [None]:
+            try:
+                data = dataset.fetch(scraper, category=category)
+            except Exception as e:
+                logger.warning("Erro ao buscar %s/%s para detectar mudanças: %s", dataset.name, category, e,
+                               extra={"category": category})
+                continue
+            yield dataset.name, category, data.get("year"), dump_payload(data)
+
+
+class ChangeWatcher:
+    """Thread que atualiza as tabelas periodicamente e publica as mudanças."""
+
+    def __init__(self, broker: ChangeBroker, interval: float = 300.0, snapshot_reader=None, scraper=None):
+        """
+        Args:
+            broker: Onde publicar as mudanças
+            interval: Segundos entre atualizações
+            snapshot_reader: Um SnapshotReader; se informado, as tabelas são lidas do snapshot
+            scraper: Um VitiBrasilScraper, usado sem snapshot; criado se None
+        """
+        self.broker = broker
+        self.interval = interval
+        self.snapshot_reader = snapshot_reader
+        self.scraper = scraper
+        self._detector = ChangeDetector()
+        self._snapshot_identity = None
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def _tables(self) -> Iterable[Table]:
+        if self.snapshot_reader is not None:
+            snapshot = self.snapshot_reader.current()
+            if snapshot is None or snapshot.identity == self._snapshot_identity:
+                return []
+            self._snapshot_identity = snapshot.identity
+            return snapshot_tables(snapshot)
+        if self.scraper is None:
+            from . import VitiBrasilScraper
+            self.scraper = VitiBrasilScraper()
+        return scraped_tables(self.scraper)
+
+    def poll(self) -> List[Dict]:
+        """Faz uma atualização e publica as mudanças encontradas; retorna os avisos publicados."""
+        detected_at = time.time()
+        events = []
+        for change in self._detector.update(self._tables()):
+            events.append(self.broker.publish(dict(change, detected_at=detected_at)))
+            metrics.DATA_CHANGES.inc(dataset=change["dataset"])
+        if events:
+            logger.info("%d tabelas mudaram desde a última atualização", len(events))
+        return events
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Erro ao atualizar as tabelas para detectar mudanças")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> None:
+        """Inicia a thread de atualização, se ainda não estiver rodando."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = Thread(target=self._run, name="vitibrasil-changes", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a thread de atualização."""
+        self._stop.set()
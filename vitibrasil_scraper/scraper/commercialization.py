@@ -2,10 +2,15 @@
 Módulo de scraper para dados de comercialização de vinhos.
 """
 
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import logging
+import time
 
 from .base import BaseScraper
+from .logs import sampled
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +27,31 @@ class CommercializationScraper(BaseScraper):
         Returns:
             Dict contendo os dados de comercialização com nomes de produtos e quantidades.
         """
+        url = self._commercialization_url(year)
+
+        logger.info("Buscando dados de comercialização para o ano: %s", year or "mais recente", extra=sampled(year=year))
+        
+        soup = self._fetch_page(url)
+        return self._parse_commercialization_page(soup)
+    
+    def _commercialization_url(self, year: Optional[int] = None) -> str:
+        """Monta a URL da página de comercialização."""
         url = f"{self.BASE_URL}/index.php?opcao=opt_04"
         if year:
             url += f"&ano={year}"
+        return url
+    
+    def _parse_commercialization_page(self, soup: "BeautifulSoup") -> Dict:
+        """
+        Extrai os dados de comercialização de uma página já analisada.
 
-        logger.info(f"Buscando dados de comercialização para o ano: {year if year else 'mais recente'}")
-        
-        soup = self._fetch_page(url)
+        Args:
+            soup: A página de comercialização analisada
+
+        Returns:
+            Dict contendo os dados de comercialização com nomes de produtos e quantidades.
+        """
+        started = time.perf_counter()
         
         # Extrai o ano e título da página
         year_text = soup.select_one(".text_center").text.strip()
@@ -87,4 +110,6 @@ class CommercializationScraper(BaseScraper):
             footnote_text = footnote_div.get_text(separator="\n").strip()
             data["footnotes"] = footnote_text
         
+        self._record_stage("commercialization", "extract", started)
+        
         return data 
\ No newline at end of file
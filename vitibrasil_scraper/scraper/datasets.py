@@ -0,0 +1,79 @@
+"""
+Registro dos datasets do site Vitibrasil.
+
+Associa cada dataset à sua opção no site, às suas categorias e aos métodos do
+VitiBrasilScraper que o buscam e extraem.
+"""
+
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Union
+
+from .exports import EXPORT_CATEGORIES
+from .imports import IMPORT_CATEGORIES
+from .processing import PROCESSING_CATEGORIES
+
+
+class Dataset(NamedTuple):
+    """Descrição de um dataset e dos métodos do scraper que o tratam."""
+
+    name: str
+    opcao: str
+    # Mapeia categoria para subopcao; None para datasets sem categorias
+    categories: Optional[Dict[str, str]]
+    # Método que busca uma página (uma categoria, se houver) de um ano
+    getter: str
+    # Método que busca todas as categorias de um ano; None para datasets sem categorias
+    all_getter: Optional[str]
+    # Método que extrai os dados de uma página já analisada
+    parser: str
+
+    def fetch(self, scraper, category: Optional[str] = None, year: Optional[int] = None) -> Dict:
+        """
+        Busca o dataset com o scraper informado.
+
+        Args:
+            scraper: Um VitiBrasilScraper
+            category: A categoria. Se None em um dataset com categorias, todas são buscadas.
+            year: O ano. Se None, o último ano disponível é usado.
+
+        Raises:
+            ValueError: Se uma categoria for informada para um dataset sem categorias
+        """
+        if self.categories is None:
+            if category is not None:
+                raise ValueError(f"O dataset '{self.name}' não possui categorias")
+            return getattr(scraper, self.getter)(year=year)
+        if category is None:
+            return getattr(scraper, self.all_getter)(year=year)
+        return getattr(scraper, self.getter)(category=category, year=year)
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in (
+        Dataset("production", "opt_02", None, "get_production_data", None, "_parse_production_page"),
+        Dataset("processing", "opt_03", PROCESSING_CATEGORIES, "get_processing_data", "get_all_processing_data", "_parse_processing_page"),
+        Dataset("commercialization", "opt_04", None, "get_commercialization_data", None, "_parse_commercialization_page"),
+        Dataset("import", "opt_05", IMPORT_CATEGORIES, "get_import_data", "get_all_import_data", "_parse_import_page"),
+        Dataset("export", "opt_06", EXPORT_CATEGORIES, "get_export_data", "get_all_export_data", "_parse_export_page"),
+    )
+}
+
+
+def is_historical_year(year: Optional[Union[int, str]], lag: int = 2) -> bool:
+    """
+    Verifica se um ano se refere a dados históricos, que não mudam mais na origem.
+
+    Args:
+        year: O ano, como inteiro ou como o valor do parâmetro 'year' da requisição
+        lag: Quantos anos antes do ano corrente os dados são considerados consolidados
+
+    Returns:
+        True se o ano for válido e anterior ao período ainda sujeito a revisões.
+    """
+    if not year:
+        return False
+    try:
+        return int(year) <= date.today().year - lag
+    except ValueError:
+        return False
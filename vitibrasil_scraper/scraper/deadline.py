@@ -0,0 +1,100 @@
+"""
+Prazos por requisição, propagados da API até as buscas no site da Embrapa.
+
+O prazo é um instante absoluto (time.monotonic) guardado em uma ContextVar:
+definido pela API no início de cada requisição, ele acompanha as chamadas ao
+scraper sem mudar suas assinaturas. A cada tentativa de busca, o timeout da
+requisição HTTP é reduzido ao tempo restante; quando o prazo se esgota, as
+tentativas e esperas de backoff restantes são canceladas com DeadlineExceeded,
+e os métodos get_all_* deixam de buscar as categorias restantes e marcam o
+resultado com "partial": true.
+
+Threads não herdam a ContextVar: código que repassa buscas a um pool de
+threads deve executá-las com contextvars.copy_context().run. Tarefas asyncio
+herdam o contexto de quem as criou.
+
+Exemplo:
+    with within(5.0):
+        scraper.get_all_export_data(year=2020)
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
+import time
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("vitibrasil_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Levantada quando o prazo da requisição se esgota antes ou durante uma busca."""
+
+    def __init__(self, message: str = "Prazo da requisição esgotado"):
+        super().__init__(message)
+
+
+def set_deadline(seconds: Optional[float]) -> Token:
+    """
+    Define o prazo do contexto atual, a partir de agora.
+
+    Um prazo já definido e mais curto é mantido: um prazo interno nunca estende o externo.
+
+    Args:
+        seconds: Segundos disponíveis; None mantém o prazo atual
+
+    Returns:
+        O token para restaurar o prazo anterior com reset_deadline().
+    """
+    current = _DEADLINE.get()
+    if seconds is None:
+        return _DEADLINE.set(current)
+    new = time.monotonic() + seconds
+    return _DEADLINE.set(new if current is None else min(current, new))
+
+
+def reset_deadline(token: Token) -> None:
+    """Restaura o prazo anterior a set_deadline()."""
+    _DEADLINE.reset(token)
+
+
+@contextmanager
+def within(seconds: Optional[float]) -> Iterator[None]:
+    """Executa o bloco com um prazo de `seconds` segundos (ou o atual, se mais curto)."""
+    token = set_deadline(seconds)
+    try:
+        yield
+    finally:
+        reset_deadline(token)
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes até o prazo (negativo se já passou), ou None sem prazo."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    """Verifica se o prazo do contexto atual já passou."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def attempt_timeout(timeout: float) -> float:
+    """
+    Timeout de uma tentativa de busca: o configurado, reduzido ao tempo restante.
+
+    Raises:
+        DeadlineExceeded: Se o prazo já passou
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(timeout, left)
+
+
+def can_wait(seconds: float) -> bool:
+    """Verifica se ainda há tempo para esperar `seconds` segundos e tentar de novo."""
+    left = remaining()
+    return left is None or seconds < left
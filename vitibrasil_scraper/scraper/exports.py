@@ -2,13 +2,35 @@
 Módulo de scraper para dados de exportação.
 """
 
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import logging
+import time
 
 from .base import BaseScraper
+from .deadline import DeadlineExceeded
+from .logs import sampled
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+# Mapeia categoria para parâmetro subopcao
+EXPORT_CATEGORIES = {
+    "vinhos_mesa": "subopt_01",
+    "espumantes": "subopt_02",
+    "uvas_frescas": "subopt_03",
+    "suco_uva": "subopt_04"
+}
+
+# Mapeia categoria para nome de exibição
+EXPORT_DISPLAY_NAMES = {
+    "vinhos_mesa": "Vinhos de Mesa",
+    "espumantes": "Espumantes",
+    "uvas_frescas": "Uvas Frescas",
+    "suco_uva": "Suco de Uva"
+}
+
 class ExportScraper(BaseScraper):
     """Scraper para dados de exportação."""
     
@@ -24,32 +46,43 @@ class ExportScraper(BaseScraper):
         Returns:
             Dict contendo os dados de exportação com países, quantidades e valores.
         """
-        # Mapeia categoria para parâmetro subopcao
-        category_map = {
-            "vinhos_mesa": "subopt_01",
-            "espumantes": "subopt_02",
-            "uvas_frescas": "subopt_03",
-            "suco_uva": "subopt_04"
-        }
+        url = self._export_url(category, year)
+
+        logger.info(
+            "Buscando dados de exportação para categoria '%s' e ano: %s", category, year or "mais recente",
+            extra=sampled(category=category, year=year),
+        )
         
-        # Mapeia categoria para nome de exibição
-        category_display_names = {
-            "vinhos_mesa": "Vinhos de Mesa",
-            "espumantes": "Espumantes",
-            "uvas_frescas": "Uvas Frescas",
-            "suco_uva": "Suco de Uva"
-        }
+        soup = self._fetch_page(url)
+        return self._parse_export_page(soup, category)
+    
+    def _export_url(self, category: str, year: Optional[int] = None) -> str:
+        """
+        Monta a URL da página de exportação de uma categoria.
         
-        if category not in category_map:
+        Raises:
+            ValueError: Se a categoria for inválida
+        """
+        if category not in EXPORT_CATEGORIES:
             raise ValueError(f"Categoria inválida: {category}. Opções válidas são: vinhos_mesa, espumantes, uvas_frescas, suco_uva")
             
-        url = f"{self.BASE_URL}/index.php?opcao=opt_06&subopcao={category_map[category]}"
+        url = f"{self.BASE_URL}/index.php?opcao=opt_06&subopcao={EXPORT_CATEGORIES[category]}"
         if year:
             url += f"&ano={year}"
+        return url
+    
+    def _parse_export_page(self, soup: "BeautifulSoup", category: str) -> Dict:
+        """
+        Extrai os dados de exportação de uma página já analisada.
 
-        logger.info(f"Buscando dados de exportação para categoria '{category}' e ano: {year if year else 'mais recente'}")
-        
-        soup = self._fetch_page(url)
+        Args:
+            soup: A página de exportação analisada
+            category: A categoria da página
+
+        Returns:
+            Dict contendo os dados de exportação com países, quantidades e valores.
+        """
+        started = time.perf_counter()
         
         # Extrai o ano e título da página
         year_text = soup.select_one(".text_center").text.strip()
@@ -61,7 +94,7 @@ class ExportScraper(BaseScraper):
             "year": current_year,
             "title": title,
             "category": category,
-            "display_name": category_display_names[category],
+            "display_name": EXPORT_DISPLAY_NAMES[category],
             "countries": [],
             "total_quantity": None,
             "total_value": None
@@ -108,6 +141,8 @@ class ExportScraper(BaseScraper):
             footnote_text = footnote_div.get_text(separator="\n").strip()
             data["footnotes"] = footnote_text
         
+        self._record_stage("export", "extract", started)
+        
         return data
     
     def get_all_export_data(self, year: Optional[int] = None) -> Dict:
@@ -134,8 +169,13 @@ class ExportScraper(BaseScraper):
                 # Atualiza o ano no resultado principal com base na primeira resposta bem-sucedida
                 if result["year"] is None:
                     result["year"] = data["year"]
+            except DeadlineExceeded as e:
+                # Sem tempo para esta categoria: o resultado segue com as já obtidas
+                logger.warning("Categoria '%s' de exportação não buscada: %s", category, e, extra={"category": category, "year": year})
+                result["categories"][category] = {"error": str(e)}
+                result["partial"] = True
             except Exception as e:
-                logger.error(f"Erro ao buscar dados de exportação para categoria '{category}': {e}")
+                logger.error("Erro ao buscar dados de exportação para categoria '%s': %s", category, e, extra={"category": category, "year": year})
                 result["categories"][category] = {"error": str(e)}
         
         return result 
\ No newline at end of file
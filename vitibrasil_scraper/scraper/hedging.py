@@ -0,0 +1,293 @@
+"""
+Requisições redundantes (hedging) e limite de taxa para o site da Embrapa.
+
+Com o hedging ativo, se uma requisição não responde dentro de um limiar
+adaptativo (por padrão o p90 das latências recentes daquela opcao), uma cópia
+é enviada e a primeira resposta bem-sucedida é usada. As cópias são limitadas
+por um orçamento proporcional ao número de requisições e pelo limite de taxa,
+de modo que o hedging não multiplica a carga sobre o site.
+
+O estado é compartilhado por todos os scrapers do processo. O hedging é
+ativado pela variável de ambiente VITIBRASIL_HEDGE=1 ou por enable(); o limite
+de taxa (requisições por segundo) por VITIBRASIL_RATE_LIMIT ou por
+set_rate_limit().
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Deque, Dict, Optional
+import asyncio
+import logging
+import os
+import time
+
+from . import metrics
+from .deadline import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket: até `rate` requisições por segundo, com rajadas de até `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"Limite de taxa inválido: {rate}. Use um valor positivo")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def _take(self) -> float:
+        """Consome um token se houver; senão, retorna quantos segundos faltam para o próximo."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """Consome um token sem esperar; retorna False se o limite foi atingido."""
+        return self._take() == 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera até que uma requisição seja permitida.
+
+        Args:
+            timeout: Espera máxima em segundos; sem limite se None
+
+        Returns:
+            True se a requisição foi permitida, False se a espera excederia timeout.
+        """
+        give_up_at = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait_time = self._take()
+            if not wait_time:
+                return True
+            if give_up_at is not None and time.monotonic() + wait_time > give_up_at:
+                return False
+            time.sleep(wait_time)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """Como acquire(), mas esperando sem bloquear o event loop (para o scraper assíncrono)."""
+        give_up_at = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait_time = self._take()
+            if not wait_time:
+                return True
+            if give_up_at is not None and time.monotonic() + wait_time > give_up_at:
+                return False
+            await asyncio.sleep(wait_time)
+
+
+class HedgeBudget:
+    """
+    Orçamento de cópias: cada requisição acumula `ratio` tokens, até `burst`, e cada cópia consome um.
+
+    No longo prazo, no máximo uma fração `ratio` das requisições gera cópias.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class LatencyTracker:
+    """Latências recentes por chave (opcao), para estimar o limiar de hedging."""
+
+    def __init__(self, quantile: float = 0.9, window: int = 200, min_samples: int = 20):
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def threshold(self, key: str) -> Optional[float]:
+        """Retorna o quantil das latências recentes, ou None se ainda há poucas amostras."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(self.quantile * len(samples)))]
+
+
+class Hedger:
+    """Executa requisições com uma cópia enviada quando a original demora além do limiar."""
+
+    def __init__(self, quantile: float = 0.9, budget_ratio: float = 0.1, initial_delay: float = 1.0, max_workers: int = 32):
+        """
+        Args:
+            quantile: Quantil das latências recentes usado como limiar
+            budget_ratio: Fração máxima das requisições que pode gerar cópias
+            initial_delay: Limiar usado enquanto há poucas amostras de latência
+            max_workers: Número máximo de requisições simultâneas feitas pelo Hedger
+        """
+        self.tracker = LatencyTracker(quantile=quantile)
+        self.budget = HedgeBudget(ratio=budget_ratio)
+        self.initial_delay = initial_delay
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vitibrasil-hedge")
+        # Requisições em andamento no pool; nunca passam de max_workers, então nada espera na fila
+        self._in_flight = 0
+        self._in_flight_lock = Lock()
+
+    def _reserve(self) -> bool:
+        """Reserva um worker livre do pool; retorna False se todos estão ocupados."""
+        with self._in_flight_lock:
+            if self._in_flight >= self.max_workers:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    def _submit(self, request: Callable[[], object], key: str) -> Future:
+        """Executa a requisição em um worker já reservado com _reserve()."""
+
+        def run():
+            # A latência é medida no worker, sem o tempo de espera pelo pool
+            started = time.perf_counter()
+            try:
+                response = request()
+            finally:
+                self._release()
+            self.tracker.observe(key, time.perf_counter() - started)
+            return response
+
+        return self._executor.submit(run)
+
+    def call(self, request: Callable[[], object], key: str, limiter: Optional[RateLimiter] = None,
+             timeout: Optional[float] = None):
+        """
+        Executa a requisição, enviando uma cópia se ela demorar além do limiar.
+
+        Args:
+            request: Função sem argumentos que faz a requisição e retorna a resposta
+            key: Chave das latências (a opcao da URL)
+            limiter: Limite de taxa que a cópia deve respeitar
+            timeout: Segundos até o prazo da requisição (ver scraper.deadline), ou None sem prazo;
+                sem tempo para esperar o limiar, nenhuma cópia é enviada
+
+        Returns:
+            A primeira resposta obtida sem exceção.
+
+        Raises:
+            DeadlineExceeded: Se o prazo se esgotar antes de uma resposta
+            Exception: A exceção da última requisição, se todas falharem
+        """
+        self.budget.deposit()
+        if not self._reserve():
+            # Pool ocupado (inclusive por cópias perdedoras ainda em andamento): a requisição é
+            # feita na própria thread, sem cópia, em vez de esperar na fila
+            metrics.FETCH_HEDGES.inc(opcao=key, outcome="saturated")
+            started = time.perf_counter()
+            response = request()
+            self.tracker.observe(key, time.perf_counter() - started)
+            return response
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+
+        def left() -> Optional[float]:
+            return None if give_up_at is None else max(give_up_at - time.monotonic(), 0.0)
+
+        def result(future: Future):
+            # As requisições continuam em segundo plano após o prazo, até o timeout delas no máximo
+            if not wait([future], timeout=left()).done:
+                raise DeadlineExceeded()
+            return future.result()
+
+        primary = self._submit(request, key)
+        delay = self.tracker.threshold(key)
+        delay = self.initial_delay if delay is None else delay
+        if give_up_at is not None and left() <= delay:
+            # A cópia só seria enviada depois do prazo
+            metrics.FETCH_HEDGES.inc(opcao=key, outcome="no_time")
+            return result(primary)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        if not self._reserve():
+            metrics.FETCH_HEDGES.inc(opcao=key, outcome="saturated")
+            return result(primary)
+        if not self.budget.try_spend():
+            self._release()
+            metrics.FETCH_HEDGES.inc(opcao=key, outcome="no_budget")
+            return result(primary)
+        if limiter is not None and not limiter.try_acquire():
+            self._release()
+            metrics.FETCH_HEDGES.inc(opcao=key, outcome="rate_limited")
+            return result(primary)
+
+        logger.debug("Enviando cópia da requisição para %s após %.3fs", key, delay, extra={"opcao": key})
+        hedge = self._submit(request, key)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=left(), return_when=FIRST_COMPLETED)
+            if not done:
+                metrics.FETCH_HEDGES.inc(opcao=key, outcome="deadline")
+                raise DeadlineExceeded()
+            for future in done:
+                if future.exception() is None:
+                    # A requisição perdedora não é cancelada: termina em segundo plano, ocupando
+                    # seu worker até o timeout no máximo; com o pool cheio, novas requisições não esperam
+                    metrics.FETCH_HEDGES.inc(opcao=key, outcome="won" if future is hedge else "lost")
+                    return future.result()
+                error = future.exception()
+        metrics.FETCH_HEDGES.inc(opcao=key, outcome="failed")
+        raise error
+
+
+def _rate_limiter_from_env() -> Optional[RateLimiter]:
+    rate = os.environ.get("VITIBRASIL_RATE_LIMIT")
+    return RateLimiter(float(rate)) if rate else None
+
+
+HEDGER: Optional[Hedger] = Hedger() if os.environ.get("VITIBRASIL_HEDGE", "").lower() in ("1", "true", "yes") else None
+RATE_LIMITER: Optional[RateLimiter] = _rate_limiter_from_env()
+
+
+def enable(quantile: float = 0.9, budget_ratio: float = 0.1, initial_delay: float = 1.0) -> None:
+    """Ativa o hedging das requisições de todos os scrapers do processo."""
+    global HEDGER
+    HEDGER = Hedger(quantile=quantile, budget_ratio=budget_ratio, initial_delay=initial_delay)
+
+
+def disable() -> None:
+    """Desativa o hedging."""
+    global HEDGER
+    HEDGER = None
+
+
+def set_rate_limit(rate: Optional[float], burst: Optional[float] = None) -> None:
+    """Limita as requisições de todos os scrapers do processo a `rate` por segundo; None remove o limite."""
+    global RATE_LIMITER
+    RATE_LIMITER = RateLimiter(rate, burst) if rate else None
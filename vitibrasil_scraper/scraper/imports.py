@@ -2,13 +2,37 @@
 Módulo de scraper para dados de importação.
 """
 
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import logging
+import time
 
 from .base import BaseScraper
+from .deadline import DeadlineExceeded
+from .logs import sampled
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+# Mapeia categoria para parâmetro subopcao
+IMPORT_CATEGORIES = {
+    "vinhos_mesa": "subopt_01",
+    "espumantes": "subopt_02",
+    "uvas_frescas": "subopt_03",
+    "uvas_passas": "subopt_04",
+    "suco_uva": "subopt_05"
+}
+
+# Mapeia categoria para nome de exibição
+IMPORT_DISPLAY_NAMES = {
+    "vinhos_mesa": "Vinhos de Mesa",
+    "espumantes": "Espumantes",
+    "uvas_frescas": "Uvas Frescas",
+    "uvas_passas": "Uvas Passas",
+    "suco_uva": "Suco de Uva"
+}
+
 class ImportScraper(BaseScraper):
     """Scraper para dados de importação."""
     
@@ -24,34 +48,43 @@ class ImportScraper(BaseScraper):
         Returns:
             Dict contendo os dados de importação com países, quantidades e valores.
         """
-        # Mapeia categoria para parâmetro subopcao
-        category_map = {
-            "vinhos_mesa": "subopt_01",
-            "espumantes": "subopt_02",
-            "uvas_frescas": "subopt_03",
-            "uvas_passas": "subopt_04",
-            "suco_uva": "subopt_05"
-        }
+        url = self._import_url(category, year)
+
+        logger.info(
+            "Buscando dados de importação para categoria '%s' e ano: %s", category, year or "mais recente",
+            extra=sampled(category=category, year=year),
+        )
         
-        # Mapeia categoria para nome de exibição
-        category_display_names = {
-            "vinhos_mesa": "Vinhos de Mesa",
-            "espumantes": "Espumantes",
-            "uvas_frescas": "Uvas Frescas",
-            "uvas_passas": "Uvas Passas",
-            "suco_uva": "Suco de Uva"
-        }
+        soup = self._fetch_page(url)
+        return self._parse_import_page(soup, category)
+    
+    def _import_url(self, category: str, year: Optional[int] = None) -> str:
+        """
+        Monta a URL da página de importação de uma categoria.
         
-        if category not in category_map:
+        Raises:
+            ValueError: Se a categoria for inválida
+        """
+        if category not in IMPORT_CATEGORIES:
             raise ValueError(f"Categoria inválida: {category}. Opções válidas são: vinhos_mesa, espumantes, uvas_frescas, uvas_passas, suco_uva")
             
-        url = f"{self.BASE_URL}/index.php?opcao=opt_05&subopcao={category_map[category]}"
+        url = f"{self.BASE_URL}/index.php?opcao=opt_05&subopcao={IMPORT_CATEGORIES[category]}"
         if year:
             url += f"&ano={year}"
+        return url
+    
+    def _parse_import_page(self, soup: "BeautifulSoup", category: str) -> Dict:
+        """
+        Extrai os dados de importação de uma página já analisada.
 
-        logger.info(f"Buscando dados de importação para categoria '{category}' e ano: {year if year else 'mais recente'}")
-        
-        soup = self._fetch_page(url)
+        Args:
+            soup: A página de importação analisada
+            category: A categoria da página
+
+        Returns:
+            Dict contendo os dados de importação com países, quantidades e valores.
+        """
+        started = time.perf_counter()
         
         # Extrai o ano e título da página
         year_text = soup.select_one(".text_center").text.strip()
@@ -63,7 +96,7 @@ class ImportScraper(BaseScraper):
             "year": current_year,
             "title": title,
             "category": category,
-            "display_name": category_display_names[category],
+            "display_name": IMPORT_DISPLAY_NAMES[category],
             "countries": [],
             "total_quantity": None,
             "total_value": None
@@ -110,6 +143,8 @@ class ImportScraper(BaseScraper):
             footnote_text = footnote_div.get_text(separator="\n").strip()
             data["footnotes"] = footnote_text
         
+        self._record_stage("import", "extract", started)
+        
         return data
     
     def get_all_import_data(self, year: Optional[int] = None) -> Dict:
@@ -136,8 +171,13 @@ class ImportScraper(BaseScraper):
                 # Atualiza o ano no resultado principal com base na primeira resposta bem-sucedida
                 if result["year"] is None:
                     result["year"] = data["year"]
+            except DeadlineExceeded as e:
+                # Sem tempo para esta categoria: o resultado segue com as já obtidas
+                logger.warning("Categoria '%s' de importação não buscada: %s", category, e, extra={"category": category, "year": year})
+                result["categories"][category] = {"error": str(e)}
+                result["partial"] = True
             except Exception as e:
-                logger.error(f"Erro ao buscar dados de importação para categoria '{category}': {e}")
+                logger.error("Erro ao buscar dados de importação para categoria '%s': %s", category, e, extra={"category": category, "year": year})
                 result["categories"][category] = {"error": str(e)}
         
         return result 
\ No newline at end of file
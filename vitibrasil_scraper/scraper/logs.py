@@ -0,0 +1,163 @@
+"""
+Configuração de logging fora do caminho crítico das requisições.
+
+Os registros são colocados em uma fila pela thread que os emite e formatados e
+escritos por uma thread de fundo (QueueListener), de modo que a thread da
+requisição não formata mensagens nem disputa o lock do stream de saída.
+
+As mensagens usam formatação preguiçosa ("%s" com argumentos), e os campos
+estruturados (opcao, subopcao, category, year, duration_ms, attempt) vão em
+`extra`. Mensagens emitidas a cada requisição são marcadas com sampled(), e
+apenas uma fração delas (sample_rate) é registrada; avisos e erros nunca são
+descartados.
+
+Exemplo:
+    logger.info("Página buscada de %s", url, extra=sampled(opcao=opcao, duration_ms=12.5))
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+
+# Campos estruturados incluídos na saída quando presentes no registro
+FIELDS = ("opcao", "subopcao", "category", "year", "duration_ms", "attempt")
+
+_TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def sampled(**fields) -> Dict:
+    """Monta o `extra` de uma mensagem por requisição, sujeita à amostragem, com seus campos estruturados."""
+    fields["sampled"] = True
+    return fields
+
+
+class SamplingFilter(logging.Filter):
+    """Mantém apenas uma fração das mensagens marcadas com sampled() abaixo de WARNING."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno >= logging.WARNING or not getattr(record, "sampled", False):
+            return True
+        return random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formata a mensagem com os campos estruturados, como texto 'chave=valor' ou como uma linha JSON."""
+
+    def __init__(self, json_lines: bool = False):
+        super().__init__(_TEXT_FORMAT)
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {name: getattr(record, name) for name in FIELDS if getattr(record, name, None) is not None}
+        if not self.json_lines:
+            text = super().format(record)
+            if fields:
+                text += " [" + " ".join(f"{name}={value}" for name, value in fields.items()) + "]"
+            return text
+
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+            **fields,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler que enfileira o registro sem formatá-lo; a formatação fica com o listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO, sample_rate: float = 1.0, json_lines: bool = False, stream: Optional[TextIO] = None) -> QueueListener:
+    """
+    Configura o logger raiz com uma fila e uma thread de escrita.
+
+    Args:
+        level: Nível mínimo dos registros
+        sample_rate: Fração das mensagens por requisição (marcadas com sampled()) mantidas
+        json_lines: Escreve cada registro como uma linha JSON, em vez de texto
+        stream: Stream de saída; sys.stderr se None
+
+    Returns:
+        O QueueListener iniciado, encerrado (com a fila esvaziada) ao fim do processo.
+    """
+    global _listener
+    _stop_listener()
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(StructuredFormatter(json_lines=json_lines))
+
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def configure_logging_from_env(level: int = logging.INFO) -> Optional[QueueListener]:
+    """
+    Configura o logging a partir de VITIBRASIL_LOG_SAMPLE e VITIBRASIL_LOG_JSON, se definidas.
+
+    Usada por processos que não recebem os argumentos da linha de comando (ex.: os
+    workers do Uvicorn, iniciados por spawn).
+
+    Returns:
+        O QueueListener iniciado, ou None se nenhuma das variáveis estiver definida.
+    """
+    sample_rate = os.environ.get("VITIBRASIL_LOG_SAMPLE")
+    json_lines = os.environ.get("VITIBRASIL_LOG_JSON")
+    if not sample_rate and not json_lines:
+        return None
+    return configure_logging(
+        level=level,
+        sample_rate=float(sample_rate) if sample_rate else 1.0,
+        json_lines=(json_lines or "").lower() in ("1", "true", "yes"),
+    )
+
+
+def _stop_listener() -> None:
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _restart_listener_in_child() -> None:
+    """Após um fork (ex.: workers do Gunicorn), a thread de escrita não existe no filho e é recriada."""
+    if _listener is None:
+        return
+    _listener.queue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, _DeferredQueueHandler):
+            handler.queue = _listener.queue
+    _listener._thread = None
+    _listener.start()
+
+
+atexit.register(_stop_listener)
+# os.register_at_fork não existe no Windows, onde não há fork
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
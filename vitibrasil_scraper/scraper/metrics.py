@@ -0,0 +1,241 @@
+"""
+Métricas no formato de exposição do Prometheus.
+
+As métricas ficam desabilitadas por padrão; nesse estado cada chamada de
+registro retorna logo na primeira linha, sem custo perceptível. Para
+habilitá-las, defina a variável de ambiente VITIBRASIL_METRICS=1 ou chame
+`enable()`.
+"""
+
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Sequence, Tuple
+import os
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base das métricas, com nome, descrição e nomes de labels."""
+
+    kind = ""
+
+    def __init__(self, registry: "Registry", name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Contador monotônico."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Incrementa o contador para o conjunto de labels informado."""
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Valor instantâneo que pode subir ou descer."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        """Define o valor do gauge para o conjunto de labels informado."""
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Histograma com buckets cumulativos, soma e contagem."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Para cada conjunto de labels: [contagens por bucket..., soma, contagem]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """Registra uma observação no histograma."""
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Mede a duração do bloco e registra no histograma."""
+        if not self._registry.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class Registry:
+    """Conjunto de métricas expostas juntas."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets=buckets))
+
+    def _register(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Retorna todas as métricas no formato texto do Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(enabled=os.environ.get("VITIBRASIL_METRICS", "").lower() in ("1", "true", "yes"))
+
+
+def enable() -> None:
+    """Habilita a coleta de métricas."""
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    """Desabilita a coleta de métricas."""
+    REGISTRY.enabled = False
+
+
+FETCH_SECONDS = REGISTRY.histogram(
+    "vitibrasil_upstream_fetch_seconds",
+    "Latência de cada tentativa de requisição ao site da Embrapa",
+    ["opcao", "subopcao", "outcome"],
+)
+FETCH_RETRIES = REGISTRY.counter(
+    "vitibrasil_upstream_retries_total",
+    "Tentativas repetidas após falha de requisição ao site da Embrapa",
+    ["opcao", "subopcao"],
+)
+FETCH_HEDGES = REGISTRY.counter(
+    "vitibrasil_upstream_hedges_total",
+    "Cópias de requisições lentas ao site da Embrapa, por resultado (won, lost, failed, no_budget, rate_limited, saturated, no_time, deadline)",
+    ["opcao", "outcome"],
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "vitibrasil_parse_seconds",
+    "Tempo de análise das páginas por dataset (html: BeautifulSoup, extract: extração das tabelas)",
+    ["dataset", "stage"],
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "vitibrasil_cache_requests_total",
+    "Consultas aos caches, por resultado (hit ou miss)",
+    ["cache", "result"],
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "vitibrasil_cache_hit_ratio",
+    "Proporção de consultas atendidas pelo cache desde o início do processo",
+    ["cache"],
+)
+SERIALIZATION_SECONDS = REGISTRY.histogram(
+    "vitibrasil_serialization_seconds",
+    "Tempo de serialização JSON das respostas por rota",
+    ["route"],
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "vitibrasil_request_seconds",
+    "Latência das requisições à API por rota",
+    ["route", "method", "status"],
+)
+DATA_CHANGES = REGISTRY.counter(
+    "vitibrasil_data_changes_total",
+    "Tabelas cujo conteúdo mudou entre duas atualizações, por dataset",
+    ["dataset"],
+)
+EVENT_SUBSCRIBERS = REGISTRY.gauge(
+    "vitibrasil_event_subscribers",
+    "Conexões abertas no stream de avisos de mudança (/api/events)",
+)
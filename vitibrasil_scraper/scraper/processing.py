@@ -2,13 +2,27 @@
 Módulo de scraper para dados de processamento de uvas.
 """
 
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import logging
+import time
 
 from .base import BaseScraper
+from .deadline import DeadlineExceeded
+from .logs import sampled
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+# Mapeia categoria para parâmetro subopcao
+PROCESSING_CATEGORIES = {
+    "viniferas": "subopt_01",
+    "americanas": "subopt_02",
+    "mesa": "subopt_03",
+    "sem_classificacao": "subopt_04"
+}
+
 class ProcessingScraper(BaseScraper):
     """Scraper para dados de processamento de uvas."""
     
@@ -23,24 +37,43 @@ class ProcessingScraper(BaseScraper):
         Returns:
             Dict contendo os dados de processamento com variedades de uvas e quantidades.
         """
-        # Mapeia categoria para parâmetro subopcao
-        category_map = {
-            "viniferas": "subopt_01",
-            "americanas": "subopt_02",
-            "mesa": "subopt_03",
-            "sem_classificacao": "subopt_04"
-        }
+        url = self._processing_url(category, year)
+
+        logger.info(
+            "Buscando dados de processamento para categoria '%s' e ano: %s", category, year or "mais recente",
+            extra=sampled(category=category, year=year),
+        )
+        
+        soup = self._fetch_page(url)
+        return self._parse_processing_page(soup, category)
+    
+    def _processing_url(self, category: str, year: Optional[int] = None) -> str:
+        """
+        Monta a URL da página de processamento de uma categoria.
         
-        if category not in category_map:
-            raise ValueError(f"Categoria inválida: {category}. Opções válidas são: {', '.join(category_map.keys())}")
+        Raises:
+            ValueError: Se a categoria for inválida
+        """
+        if category not in PROCESSING_CATEGORIES:
+            raise ValueError(f"Categoria inválida: {category}. Opções válidas são: {', '.join(PROCESSING_CATEGORIES.keys())}")
             
-        url = f"{self.BASE_URL}/index.php?opcao=opt_03&subopcao={category_map[category]}"
+        url = f"{self.BASE_URL}/index.php?opcao=opt_03&subopcao={PROCESSING_CATEGORIES[category]}"
         if year:
             url += f"&ano={year}"
+        return url
+    
+    def _parse_processing_page(self, soup: "BeautifulSoup", category: str) -> Dict:
+        """
+        Extrai os dados de processamento de uma página já analisada.
 
-        logger.info(f"Buscando dados de processamento para categoria '{category}' e ano: {year if year else 'mais recente'}")
-        
-        soup = self._fetch_page(url)
+        Args:
+            soup: A página de processamento analisada
+            category: A categoria da página
+
+        Returns:
+            Dict contendo os dados de processamento com variedades de uvas e quantidades.
+        """
+        started = time.perf_counter()
         
         # Extrai o ano e título da página
         year_text = soup.select_one(".text_center").text.strip()
@@ -100,6 +133,8 @@ class ProcessingScraper(BaseScraper):
             footnote_text = footnote_div.get_text(separator="\n").strip()
             data["footnotes"] = footnote_text
         
+        self._record_stage("processing", "extract", started)
+        
         return data
         
     def get_all_processing_data(self, year: Optional[int] = None) -> Dict:
@@ -126,8 +161,13 @@ class ProcessingScraper(BaseScraper):
                 # Atualiza o ano no resultado principal com base na primeira resposta bem-sucedida
                 if result["year"] is None:
                     result["year"] = data["year"]
+            except DeadlineExceeded as e:
+                # Sem tempo para esta categoria: o resultado segue com as já obtidas
+                logger.warning("Categoria '%s' de processamento não buscada: %s", category, e, extra={"category": category, "year": year})
+                result["categories"][category] = {"error": str(e)}
+                result["partial"] = True
             except Exception as e:
-                logger.error(f"Erro ao buscar dados de processamento para categoria '{category}': {e}")
+                logger.error("Erro ao buscar dados de processamento para categoria '%s': %s", category, e, extra={"category": category, "year": year})
                 result["categories"][category] = {"error": str(e)}
         
         return result 
\ No newline at end of file
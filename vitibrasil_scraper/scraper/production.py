@@ -2,10 +2,15 @@
 Módulo de scraper para dados de produção.
 """
 
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import logging
+import time
 
 from .base import BaseScraper
+from .logs import sampled
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +27,31 @@ class ProductionScraper(BaseScraper):
         Returns:
             Dict contendo os dados de produção com nomes de produtos e quantidades.
         """
+        url = self._production_url(year)
+
+        logger.info("Buscando dados de produção para o ano: %s", year or "mais recente", extra=sampled(year=year))
+        
+        soup = self._fetch_page(url)
+        return self._parse_production_page(soup)
+    
+    def _production_url(self, year: Optional[int] = None) -> str:
+        """Monta a URL da página de produção."""
         url = f"{self.BASE_URL}/index.php?opcao=opt_02"
         if year:
             url += f"&ano={year}"
+        return url
+    
+    def _parse_production_page(self, soup: "BeautifulSoup") -> Dict:
+        """
+        Extrai os dados de produção de uma página já analisada.
 
-        logger.info(f"Buscando dados de produção para o ano: {year if year else 'mais recente'}")
-        
-        soup = self._fetch_page(url)
+        Args:
+            soup: A página de produção analisada
+
+        Returns:
+            Dict contendo os dados de produção com nomes de produtos e quantidades.
+        """
+        started = time.perf_counter()
         
         # Extrai o ano da página
         year_text = soup.select_one(".text_center").text.strip()
@@ -79,4 +102,6 @@ class ProductionScraper(BaseScraper):
             if len(total_cells) > 1:
                 data["total"] = self._parse_number(total_cells[1].text.strip())
         
+        self._record_stage("production", "extract", started)
+        
         return data 
\ No newline at end of file
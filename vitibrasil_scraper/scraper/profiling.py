@@ -0,0 +1,228 @@
+"""
+Perfilamento sob demanda do scraper e da API.
+
+Um `Profiler` grava, para cada execução perfilada, um arquivo compatível com
+ferramentas de flamegraph e acumula um resumo por endpoint com o tempo gasto em
+cada etapa (busca na rede, análise do HTML, extração das tabelas e serialização).
+
+Modos disponíveis:
+    sampling: amostra a pilha da thread perfilada em intervalos fixos e grava
+              pilhas colapsadas (.folded), aceitas por flamegraph.pl, inferno e speedscope.
+    cprofile: usa o cProfile e grava estatísticas (.pstats), aceitas por snakeviz e flameprof.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from threading import Event, Lock, Thread, get_ident, local
+from typing import Dict, Iterator, Optional
+import atexit
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sampling", "cprofile")
+
+# Sessão de perfilamento ativa na thread atual, se houver
+_local = local()
+
+
+def record(section: str, seconds: float) -> None:
+    """
+    Acumula a duração de uma etapa na sessão de perfilamento da thread atual.
+
+    Sem sessão ativa, retorna imediatamente.
+    """
+    session = getattr(_local, "session", None)
+    if session is not None:
+        session.sections[section] = session.sections.get(section, 0.0) + seconds
+
+
+class _Session:
+    """Tempos acumulados por etapa durante uma execução perfilada."""
+
+    __slots__ = ("sections",)
+
+    def __init__(self):
+        self.sections: Dict[str, float] = {}
+
+
+class _StackSampler(Thread):
+    """
+    Thread única do processo que amostra a pilha das threads em perfilamento.
+
+    Conta as pilhas colapsadas de cada thread registrada com add(); sem threads
+    registradas, fica parada.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True, name="vitibrasil-profiler")
+        self.interval = interval
+        self._stacks: Dict[int, Counter] = {}
+        self._lock = Lock()
+        self._active = Event()
+
+    def add(self, thread_id: int) -> None:
+        """Passa a amostrar a thread informada."""
+        with self._lock:
+            self._stacks[thread_id] = Counter()
+            self._active.set()
+
+    def remove(self, thread_id: int) -> Counter:
+        """Deixa de amostrar a thread e retorna as pilhas contadas desde add()."""
+        with self._lock:
+            stacks = self._stacks.pop(thread_id, Counter())
+            if not self._stacks:
+                self._active.clear()
+        return stacks
+
+    def run(self):
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._stacks.items():
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    names = []
+                    while frame is not None:
+                        code = frame.f_code
+                        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    stacks[";".join(reversed(names))] += 1
+
+
+class Profiler:
+    """Perfilador que grava arquivos de flamegraph e resume o tempo por endpoint."""
+
+    def __init__(self, output_dir: str = "profiles", mode: str = "sampling", interval: float = 0.001, summary_interval: float = 10.0):
+        """
+        Inicializa o perfilador.
+
+        Args:
+            output_dir: Diretório onde os perfis e o resumo são gravados
+            mode: 'sampling' ou 'cprofile'
+            interval: Intervalo de amostragem em segundos (apenas no modo 'sampling')
+            summary_interval: Intervalo mínimo em segundos entre gravações do resumo; ele também é gravado ao fim do processo
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo de perfilamento inválido: {mode}. Opções válidas são: {', '.join(MODES)}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.summary_interval = summary_interval
+        self._summary: Dict[str, Dict] = {}
+        self._summary_dirty = False
+        self._summary_written_at = float("-inf")
+        self._lock = Lock()
+        # Criado no processo que perfila (após o fork, nos workers do Gunicorn)
+        self._sampler: Optional[_StackSampler] = None
+        self._sampler_pid: Optional[int] = None
+        # O cProfile admite apenas um perfilador ativo por vez no processo
+        self._cprofile_lock = Lock()
+        os.makedirs(output_dir, exist_ok=True)
+        atexit.register(self.flush_summary)
+
+    def _shared_sampler(self) -> _StackSampler:
+        with self._lock:
+            if self._sampler is None or self._sampler_pid != os.getpid():
+                self._sampler = _StackSampler(self.interval)
+                self._sampler_pid = os.getpid()
+                self._sampler.start()
+            return self._sampler
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        """
+        Perfila o bloco, gravando um arquivo de perfil e atualizando o resumo de `label`.
+
+        Args:
+            label: Nome da execução perfilada (ex.: o padrão da rota)
+        """
+        if getattr(_local, "session", None) is not None:
+            # Execução aninhada: as etapas já são contabilizadas pela sessão externa
+            yield
+            return
+
+        session = _local.session = _Session()
+        sampler: Optional[_StackSampler] = None
+        profile: Optional[cProfile.Profile] = None
+        if self.mode == "sampling":
+            sampler = self._shared_sampler()
+            sampler.add(get_ident())
+        elif self._cprofile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            profile.enable()
+        else:
+            logger.warning("cProfile já está em uso; apenas os tempos por etapa de '%s' serão registrados", label)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _local.session = None
+            path = None
+            if sampler is not None:
+                path = self._write_folded(label, sampler.remove(get_ident()))
+            elif profile is not None:
+                profile.disable()
+                self._cprofile_lock.release()
+                path = self._output_path(label, "pstats")
+                profile.dump_stats(path)
+            self._update_summary(label, elapsed, session.sections)
+            if path:
+                logger.info("Perfil de '%s' gravado em %s (%.1f ms)", label, path, elapsed * 1000)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Retorna o resumo acumulado por endpoint."""
+        with self._lock:
+            return json.loads(json.dumps(self._summary))
+
+    def _output_path(self, label: str, extension: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_") or "root"
+        return os.path.join(self.output_dir, f"{slug}-{int(time.time() * 1000)}-{os.getpid()}-{get_ident()}.{extension}")
+
+    def _write_folded(self, label: str, stacks: Counter) -> Optional[str]:
+        if not stacks:
+            return None
+        path = self._output_path(label, "folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def _update_summary(self, label: str, elapsed: float, sections: Dict[str, float]) -> None:
+        with self._lock:
+            entry = self._summary.setdefault(label, {"count": 0, "total_seconds": 0.0, "sections": {}})
+            entry["count"] += 1
+            entry["total_seconds"] += elapsed
+            for name, seconds in sections.items():
+                entry["sections"][name] = entry["sections"].get(name, 0.0) + seconds
+            self._summary_dirty = True
+            due = time.monotonic() - self._summary_written_at >= self.summary_interval
+        if due:
+            self.flush_summary()
+
+    def flush_summary(self) -> None:
+        """Grava o resumo em summary-<pid>.json, se mudou desde a última gravação."""
+        with self._lock:
+            if not self._summary_dirty:
+                return
+            self._summary_dirty = False
+            self._summary_written_at = time.monotonic()
+            content = json.dumps(self._summary, indent=2, ensure_ascii=False)
+        # Gravação fora do lock, para não bloquear as demais requisições perfiladas, e
+        # substituição atômica, para que gravações simultâneas não se misturem
+        path = os.path.join(self.output_dir, f"summary-{os.getpid()}.json")
+        temp_path = f"{path}.{get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
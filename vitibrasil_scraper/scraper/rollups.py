@@ -0,0 +1,248 @@
+"""
+Agregados derivados dos datasets, materializados na publicação do snapshot.
+
+Cada função recebe as tabelas de um dataset já extraídas pelos métodos get_*
+e devolve os agregados prontos para serem servidos, de modo que as rotas não
+precisam percorrer todos os anos e linhas a cada requisição.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import unicodedata
+
+
+def normalize_country(name: str) -> str:
+    """Normaliza o nome de um país para comparação: sem acentos, maiúsculas ou espaços nas pontas."""
+    decomposed = unicodedata.normalize("NFKD", name.strip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _change(current: Optional[int], previous: Optional[int]) -> Tuple[Optional[int], Optional[float]]:
+    """Retorna a variação absoluta e percentual entre dois valores, quando definida."""
+    if current is None or previous is None:
+        return None, None
+    pct = round((current - previous) / previous * 100, 2) if previous else None
+    return current - previous, pct
+
+
+def _share(part: Optional[int], total: Optional[int]) -> Optional[float]:
+    """Retorna a participação percentual de um valor no total, quando definida."""
+    if part is None or not total:
+        return None
+    return round(part / total * 100, 4)
+
+
+def _by_year(tables: Iterable[Dict]) -> List[Dict]:
+    """Ordena as tabelas por ano, descartando anos repetidos."""
+    unique = {table["year"]: table for table in tables}
+    return [unique[year] for year in sorted(unique)]
+
+
+def trade_totals(table: Dict) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Retorna a quantidade e o valor totais de uma tabela de importação/exportação.
+
+    Usa o total do rodapé da página e, na ausência dele, a soma dos países.
+    """
+    quantity, value = table.get("total_quantity"), table.get("total_value")
+    if quantity is None:
+        quantity = sum(country["quantity"] or 0 for country in table["countries"])
+    if value is None:
+        value = sum(country["value"] or 0 for country in table["countries"])
+    return quantity, value
+
+
+def trade_shares(table: Dict) -> Dict:
+    """
+    Calcula a participação de cada país no total de uma tabela de importação/exportação.
+
+    Returns:
+        Dict com os totais do ano e, por país, a quantidade, o valor e as
+        participações percentuais em quantidade e valor.
+    """
+    total_quantity, total_value = trade_totals(table)
+    return {
+        "year": table["year"],
+        "category": table["category"],
+        "display_name": table["display_name"],
+        "total_quantity": total_quantity,
+        "total_value": total_value,
+        "countries": [
+            {
+                "name": country["name"],
+                "quantity": country["quantity"],
+                "value": country["value"],
+                "quantity_share": _share(country["quantity"], total_quantity),
+                "value_share": _share(country["value"], total_value),
+            }
+            for country in table["countries"]
+        ],
+    }
+
+
+def trade_yoy(tables: Iterable[Dict]) -> Dict:
+    """
+    Calcula os totais anuais de uma categoria de importação/exportação e sua variação ano a ano.
+
+    Args:
+        tables: As tabelas da categoria, uma por ano
+
+    Returns:
+        Dict com, por ano, os totais de quantidade e valor e as variações
+        absoluta e percentual em relação ao ano anterior disponível.
+    """
+    tables = _by_year(tables)
+    years = []
+    previous = (None, None)
+    for table in tables:
+        quantity, value = trade_totals(table)
+        quantity_change, quantity_change_pct = _change(quantity, previous[0])
+        value_change, value_change_pct = _change(value, previous[1])
+        years.append({
+            "year": table["year"],
+            "total_quantity": quantity,
+            "total_value": value,
+            "quantity_change": quantity_change,
+            "quantity_change_pct": quantity_change_pct,
+            "value_change": value_change,
+            "value_change_pct": value_change_pct,
+        })
+        previous = (quantity, value)
+
+    first = tables[0] if tables else {}
+    return {
+        "category": first.get("category"),
+        "display_name": first.get("display_name"),
+        "years": years,
+    }
+
+
+def product_growth(tables: Iterable[Dict]) -> Dict:
+    """
+    Calcula a variação ano a ano de cada produto e do total de uma tabela de produtos.
+
+    Args:
+        tables: As tabelas de produção, uma por ano
+
+    Returns:
+        Dict com a série anual do total e de cada produto principal, com as
+        variações absoluta e percentual em relação ao ano anterior disponível.
+    """
+    tables = _by_year(tables)
+    products: Dict[str, List[Dict]] = {}
+    total = []
+    for table in tables:
+        for product in table["products"]:
+            series = products.setdefault(product["name"], [])
+            previous = series[-1]["quantity"] if series else None
+            change, change_pct = _change(product["quantity"], previous)
+            series.append({"year": table["year"], "quantity": product["quantity"], "change": change, "change_pct": change_pct})
+
+        previous = total[-1]["quantity"] if total else None
+        change, change_pct = _change(table["total"], previous)
+        total.append({"year": table["year"], "quantity": table["total"], "change": change, "change_pct": change_pct})
+
+    return {
+        "years": [table["year"] for table in tables],
+        "total": total,
+        "products": [{"name": name, "series": series} for name, series in products.items()],
+    }
+
+
+def _sum(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    """Soma dois valores, tratando None como zero quando apenas um deles está ausente."""
+    if a is None and b is None:
+        return None
+    return (a or 0) + (b or 0)
+
+
+def _balance(imported: Optional[int], exported: Optional[int]) -> Optional[int]:
+    """Saldo (exportado menos importado), com None apenas quando os dois lados estão ausentes."""
+    if imported is None and exported is None:
+        return None
+    return (exported or 0) - (imported or 0)
+
+
+def trade_balance(imports: Dict[int, Dict], exports: Dict[int, Dict]) -> Dict:
+    """
+    Cruza importações e exportações de uma categoria por país e ano.
+
+    Para cada ano, as importações formam uma tabela hash indexada pelo nome
+    normalizado do país, consultada por cada país das exportações; os países
+    presentes apenas nas importações entram em seguida (junção externa).
+
+    Args:
+        imports: Tabelas de importação da categoria, por ano
+        exports: Tabelas de exportação da categoria, por ano
+
+    Returns:
+        Dict com, por país, as quantidades e valores importados e exportados e
+        o saldo (exportado menos importado) somados no período e ano a ano,
+        além do total de todos os países.
+    """
+    years = sorted(set(imports) & set(exports))
+    countries: Dict[str, Dict] = {}
+    for year in years:
+        build = {normalize_country(row["name"]): row for row in imports[year]["countries"]}
+        matched = set()
+        rows = []
+        for exported in exports[year]["countries"]:
+            key = normalize_country(exported["name"])
+            imported = build.get(key)
+            if imported is not None:
+                matched.add(key)
+            rows.append((key, exported["name"], imported, exported))
+        rows.extend((key, row["name"], row, None) for key, row in build.items() if key not in matched)
+
+        for key, name, imported, exported in rows:
+            entry = countries.get(key)
+            if entry is None:
+                entry = countries[key] = {"name": name, "by_year": []}
+            import_quantity = imported["quantity"] if imported else None
+            import_value = imported["value"] if imported else None
+            export_quantity = exported["quantity"] if exported else None
+            export_value = exported["value"] if exported else None
+            entry["by_year"].append({
+                "year": year,
+                "import_quantity": import_quantity,
+                "import_value": import_value,
+                "export_quantity": export_quantity,
+                "export_value": export_value,
+                "balance_quantity": _balance(import_quantity, export_quantity),
+                "balance_value": _balance(import_value, export_value),
+            })
+
+    fields = ("import_quantity", "import_value", "export_quantity", "export_value", "balance_quantity", "balance_value")
+    total = dict.fromkeys(fields)
+    result = []
+    for key in sorted(countries):
+        entry = countries[key]
+        for field in fields:
+            value = None
+            for year_entry in entry["by_year"]:
+                value = _sum(value, year_entry[field])
+            entry[field] = value
+            total[field] = _sum(total[field], value)
+        result.append(entry)
+
+    return {"years": years, "countries": result, "total": total}
+
+
+def materialize(tables: Dict[Tuple[str, Optional[str]], Dict[Optional[int], Dict]]) -> Iterator[Tuple[str, Optional[str], Optional[int], Dict]]:
+    """
+    Calcula todos os agregados a partir das tabelas de um snapshot.
+
+    Args:
+        tables: Mapeia (dataset, categoria) para as tabelas por ano; o ano None
+                é o último ano disponível
+
+    Yields:
+        Tuplas (agregado, categoria, ano, dados), no formato das chaves do
+        snapshot. O ano é None para agregados que cobrem todos os anos.
+    """
+    for (dataset, category), by_year in tables.items():
+        if dataset in ("import", "export"):
+            for year, table in by_year.items():
+                yield f"{dataset}.shares", category, year, trade_shares(table)
+            yield f"{dataset}.yoy", category, None, trade_yoy(by_year.values())
+        elif dataset == "production":
+            yield "production.growth", None, None, product_growth(by_year.values())
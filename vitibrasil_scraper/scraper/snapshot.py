@@ -0,0 +1,270 @@
+"""
+Snapshot somente leitura dos datasets, compartilhado entre processos.
+
+Um único processo (o refresher) busca todos os datasets e anos com os métodos
+get_* do scraper e grava um arquivo de snapshot. Cada worker da API mapeia o
+arquivo em memória (mmap) somente para leitura, de modo que os dados são
+servidos sem cópia e compartilhados pelo page cache do sistema operacional.
+
+Formato do arquivo:
+    MAGIC (8 bytes) | tamanho do índice (uint64, little-endian) | índice JSON | payloads
+
+O índice mapeia cada chave "dataset/categoria/ano" para [offset, tamanho, ano]
+do payload, relativo ao início da área de payloads. Cada payload é o JSON
+compacto dos dados, serializado como no jsonify do Flask.
+
+Um novo snapshot é publicado gravando um arquivo temporário no mesmo diretório
+e renomeando-o sobre o anterior (os.replace), o que é atômico: os leitores
+veem o snapshot antigo ou o novo, nunca um arquivo parcial.
+"""
+
+from threading import Lock
+from typing import Dict, Iterable, Optional
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+from . import rollups
+from .datasets import DATASETS, is_historical_year
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VBSNAP01"
+_HEADER = struct.Struct("<Q")
+
+# Chave usada no lugar do ano para o último ano disponível
+LATEST = "latest"
+
+
+def snapshot_key(dataset: str, category: Optional[str] = None, year: Optional[int] = None) -> str:
+    """Monta a chave de um payload no snapshot."""
+    return f"{dataset}/{category or '-'}/{year if year is not None else LATEST}"
+
+
+def dump_payload(data: Dict) -> bytes:
+    """Serializa os dados como o jsonify do Flask, sem a quebra de linha final."""
+    return json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class Snapshot:
+    """Um arquivo de snapshot mapeado em memória."""
+
+    def __init__(self, path: str):
+        """
+        Abre e mapeia o snapshot.
+
+        Args:
+            path: Caminho do arquivo de snapshot
+
+        Raises:
+            ValueError: Se o arquivo não for um snapshot válido
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            # O mapeamento continua válido depois que o arquivo é fechado ou substituído
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+
+        header_size = len(MAGIC) + _HEADER.size
+        if len(self._map) < header_size or self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Arquivo de snapshot inválido: {path}")
+        (index_size,) = _HEADER.unpack_from(self._map, len(MAGIC))
+        index = json.loads(self._map[header_size:header_size + index_size])
+
+        self.created_at = index["created_at"]
+        self._entries = index["entries"]
+        self._data_start = header_size + index_size
+        self._view = memoryview(self._map)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def keys(self) -> Iterable[str]:
+        return self._entries.keys()
+
+    def raw(self, key: str) -> Optional[memoryview]:
+        """Retorna o payload JSON de uma chave sem copiá-lo, ou None se ausente."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        offset, size, _ = entry
+        start = self._data_start + offset
+        return self._view[start:start + size]
+
+    def year(self, key: str) -> Optional[int]:
+        """Retorna o ano dos dados de uma chave, útil para as chaves do último ano."""
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def get(self, dataset: str, category: Optional[str] = None, year: Optional[int] = None) -> Optional[Dict]:
+        """Retorna os dados decodificados de um dataset, ou None se ausentes."""
+        raw = self.raw(snapshot_key(dataset, category, year))
+        return json.loads(bytes(raw)) if raw is not None else None
+
+    def compose_all(self, dataset: str, year: Optional[int] = None) -> Optional[bytes]:
+        """
+        Monta o payload de todas as categorias de um dataset, como os métodos get_all_*.
+
+        Os payloads das categorias são concatenados sem serem decodificados.
+
+        Returns:
+            O JSON no formato {"categories": {...}, "year": ...}, ou None se
+            alguma categoria estiver ausente do snapshot.
+        """
+        categories = DATASETS[dataset].categories
+        parts = []
+        result_year = year
+        for category in categories:
+            key = snapshot_key(dataset, category, year)
+            raw = self.raw(key)
+            if raw is None:
+                return None
+            if result_year is None:
+                result_year = self.year(key)
+            parts.append((category, raw))
+
+        # Chaves ordenadas, como no jsonify
+        body = [b'{"categories":{']
+        for i, (category, raw) in enumerate(sorted(parts, key=lambda part: part[0])):
+            if i:
+                body.append(b",")
+            body.append(dump_payload(category) + b":")
+            body.append(raw)
+        body.append(b'},"year":' + dump_payload(result_year) + b"}")
+        return b"".join(body)
+
+
+class SnapshotReader:
+    """
+    Mantém o snapshot mais recente de um caminho.
+
+    O arquivo é verificado no máximo a cada check_interval segundos; quando um
+    novo snapshot é publicado, ele é mapeado e passa a ser retornado, enquanto
+    o anterior continua válido para quem ainda o estiver lendo.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = float("-inf")
+        self._lock = Lock()
+
+    def current(self) -> Optional[Snapshot]:
+        """Retorna o snapshot atual, ou None se nenhum foi publicado ainda."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.identity != (stat.st_ino, stat.st_mtime_ns):
+                try:
+                    self._snapshot = Snapshot(self.path)
+                    logger.info("Snapshot carregado de %s (%d payloads)", self.path, len(self._snapshot))
+                except (OSError, ValueError) as e:
+                    logger.error("Erro ao carregar snapshot de %s: %s", self.path, e)
+            return self._snapshot
+
+
+def build_snapshot(path: str, years: Iterable[int], scraper=None, include_latest: bool = True) -> Dict:
+    """
+    Busca todos os datasets e publica um novo snapshot.
+
+    Os payloads de anos históricos já presentes no snapshot anterior são
+    reaproveitados em vez de buscados novamente. Depois da busca, os agregados
+    de scraper.rollups são calculados e gravados junto das tabelas.
+
+    Args:
+        path: Caminho onde o snapshot é publicado
+        years: Os anos a incluir
+        scraper: O VitiBrasilScraper usado nas buscas; um novo é criado se None
+        include_latest: Inclui também o último ano disponível de cada dataset
+
+    Returns:
+        Dict com o número de payloads gravados, reaproveitados e com erro.
+    """
+    if scraper is None:
+        from . import VitiBrasilScraper
+        scraper = VitiBrasilScraper()
+
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = Snapshot(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Snapshot anterior ignorado: %s", e)
+
+    years = list(years) + ([None] if include_latest else [])
+    entries: Dict[str, list] = {}
+    payloads = []
+    offset = 0
+    stats = {"entries": 0, "reused": 0, "errors": 0}
+    # Tabelas decodificadas por (dataset, categoria) e ano, para os agregados
+    tables: Dict[tuple, Dict[Optional[int], Dict]] = {}
+
+    def add(key: str, payload: bytes, data_year: Optional[int]):
+        nonlocal offset
+        entries[key] = [offset, len(payload), data_year]
+        payloads.append(payload)
+        offset += len(payload)
+
+    for dataset in DATASETS.values():
+        for category in dataset.categories or [None]:
+            for year in years:
+                key = snapshot_key(dataset.name, category, year)
+                if previous is not None and key in previous and is_historical_year(year):
+                    payload = bytes(previous.raw(key))
+                    data = json.loads(payload)
+                    stats["reused"] += 1
+                else:
+                    try:
+                        data = dataset.fetch(scraper, category=category, year=year)
+                    except Exception as e:
+                        logger.error("Erro ao buscar %s para o snapshot: %s", key, e, extra={"category": category, "year": year})
+                        stats["errors"] += 1
+                        continue
+                    payload = dump_payload(data)
+
+                add(key, payload, data.get("year"))
+                tables.setdefault((dataset.name, category), {})[year] = data
+
+    for name, category, year, data in rollups.materialize(tables):
+        add(snapshot_key(name, category, year), dump_payload(data), data.get("year"))
+
+    stats["entries"] = len(entries)
+    index = json.dumps({"created_at": time.time(), "entries": entries}, separators=(",", ":")).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER.pack(len(index)))
+            f.write(index)
+            for payload in payloads:
+                f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    logger.info("Snapshot publicado em %s: %s", path, stats)
+    return stats